@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.db.models.base import DEFERRED
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken, TokenError)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import aware_utcnow
+
+# Пароль в кеш не кладём: в восстановленном объекте поле отложено
+# и при обращении будет прочитано из базы.
+SKIP_FIELDS = ('password',)
+
+
+def user_cache_key(user_id):
+    return f'api:auth:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    """Удаляет пользователя из кеша аутентификации."""
+    cache.delete(user_cache_key(user_id))
+
+
+class TokenCache:
+    """LRU-кеш проверенных токенов: подпись одного и того же токена
+    проверяется один раз, срок действия — при каждом запросе."""
+
+    def __init__(self):
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            token = self.tokens.get(raw_token)
+            if token is not None:
+                self.tokens.move_to_end(raw_token)
+        return token
+
+    def set(self, raw_token, token):
+        with self.lock:
+            self.tokens[raw_token] = token
+            self.tokens.move_to_end(raw_token)
+            while len(self.tokens) > settings.AUTH_TOKEN_CACHE_SIZE:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса к базе на каждый запрос.
+    Поля пользователя хранятся в кеше по id и сбрасываются сигналами
+    при изменении или удалении пользователя (api.signals) - только
+    если кеш общий для всех воркеров (API_CACHE_SHARED).
+    """
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.set(raw_token, token)
+            return token
+        try:
+            token.check_exp(current_time=aware_utcnow())
+        except TokenError as error:
+            raise InvalidToken(error.args[0])
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+        if not settings.API_CACHE_SHARED:
+            # Сброс в кеше одного процесса не дойдёт до других воркеров,
+            # и снятые роль или блокировка действовали бы до конца TTL.
+            return super().get_user(validated_token)
+        data = cache.get(user_cache_key(user_id))
+        if data is None:
+            user = super().get_user(validated_token)
+            cache.set(user_cache_key(user_id), self.dump_user(user),
+                      settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+        user = self.load_user(data)
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'),
+                                       code='user_inactive')
+        return user
+
+    def dump_user(self, user):
+        return {
+            field.attname: getattr(user, field.attname)
+            for field in self.user_model._meta.concrete_fields
+            if field.attname not in SKIP_FIELDS
+        }
+
+    def load_user(self, data):
+        fields = self.user_model._meta.concrete_fields
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            [field.attname for field in fields],
+            [data.get(field.attname, DEFERRED) for field in fields],
+        )
@@ -0,0 +1,164 @@
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import serializers
+from reviews.counters import recount_titles
+from reviews.leaderboards import schedule_update
+from reviews.models import (Category, Genre, Review, ScoreHistogram, Title,
+                            User)
+
+from .cache import CATALOG_SCOPE, bump_version
+from .search import get_search_backend
+from .serializers import (BulkReviewSerializer, BulkTitleSerializer,
+                          GetTitleSerializer, ReviewSerializer)
+
+NOT_FOUND = 'Объект с slug={} не существует.'
+
+
+def validate_items(data, serializer_class):
+    """
+    Проверяет список элементов сериализатором serializer_class.
+    Возвращает список результатов (None для прошедших проверку)
+    и список пар (индекс, validated_data).
+    """
+    if not isinstance(data, list):
+        raise serializers.ValidationError('Ожидается список объектов.')
+    if len(data) > settings.API_BULK_LIMIT:
+        raise serializers.ValidationError(
+            f'Не больше {settings.API_BULK_LIMIT} объектов за запрос.'
+        )
+    results = [None] * len(data)
+    valid = []
+    for index, item in enumerate(data):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = invalid(index, serializer.errors)
+    return results, valid
+
+
+def invalid(index, errors):
+    return {'index': index, 'status': 'invalid', 'errors': errors}
+
+
+def created(index, data):
+    return {'index': index, 'status': 'created', 'data': data}
+
+
+def insert(model, objects):
+    """
+    Вставляет объекты одним bulk_create, если база возвращает id
+    вставленных строк (PostgreSQL), иначе сохраняет их по одному:
+    на SQLite это один INSERT на объект, пакет из API_BULK_LIMIT
+    элементов стоит столько же запросов.
+    """
+    if connection.features.can_return_ids_from_bulk_insert:
+        model.objects.bulk_create(objects)
+    else:
+        for obj in objects:
+            obj.save()
+
+
+def bulk_create_titles(data):
+    """
+    Создаёт произведения из списка data.
+    Категории и жанры всего пакета ищутся одним запросом каждые,
+    произведения и связи с жанрами вставляются через bulk_create.
+    Возвращает результаты по каждому элементу.
+    """
+    results, valid = validate_items(data, BulkTitleSerializer)
+    categories = dict(Category.objects.filter(
+        slug__in={item['category'] for _, item in valid}
+    ).values_list('slug', 'id'))
+    genres = dict(Genre.objects.filter(
+        slug__in={slug for _, item in valid for slug in item['genre']}
+    ).values_list('slug', 'id'))
+    titles = []
+    for index, item in valid:
+        errors = {}
+        if item['category'] not in categories:
+            errors['category'] = [NOT_FOUND.format(item['category'])]
+        missing = [slug for slug in item['genre'] if slug not in genres]
+        if missing:
+            errors['genre'] = [NOT_FOUND.format(slug) for slug in missing]
+        if errors:
+            results[index] = invalid(index, errors)
+            continue
+        title = Title(
+            name=item['name'],
+            year=item['year'],
+            description=item.get('description'),
+            category_id=categories[item['category']],
+        )
+        titles.append((index, title, {genres[slug] for slug in item['genre']}))
+    if not titles:
+        return results
+    with transaction.atomic():
+        insert(Title, [title for _, title, _ in titles])
+        # Без PostgreSQL произведения сохраняются по одному, и строки
+        # распределений уже созданы сигналом.
+        ScoreHistogram.objects.bulk_create([
+            ScoreHistogram(title_id=title.pk) for _, title, _ in titles
+        ], ignore_conflicts=True)
+        Title.genre.through.objects.bulk_create([
+            Title.genre.through(title_id=title.pk, genre_id=genre_id)
+            for _, title, genre_ids in titles
+            for genre_id in genre_ids
+        ])
+    search = get_search_backend()
+    for _, title, _ in titles:
+        search.update(title)
+    bump_version(CATALOG_SCOPE)
+    saved = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).in_bulk([title.pk for _, title, _ in titles])
+    for index, title, _ in titles:
+        results[index] = created(
+            index, GetTitleSerializer(saved[title.pk]).data
+        )
+    return results
+
+
+def bulk_create_reviews(title, data):
+    """
+    Создаёт отзывы на произведение title из списка data.
+    Авторы и их существующие отзывы ищутся одним запросом каждые,
+    отзывы вставляются через bulk_create, после чего счётчики
+    рейтинга произведения пересчитываются.
+    Возвращает результаты по каждому элементу.
+    """
+    results, valid = validate_items(data, BulkReviewSerializer)
+    authors = {user.username: user for user in User.objects.filter(
+        username__in={item['author'] for _, item in valid}
+    )}
+    reviewed = set(title.reviews.filter(
+        author__in=authors.values()
+    ).values_list('author_id', flat=True))
+    reviews = []
+    for index, item in valid:
+        author = authors.get(item['author'])
+        if author is None:
+            results[index] = invalid(index, {'author': [
+                f'Пользователь {item["author"]} не существует.'
+            ]})
+        elif author.pk in reviewed:
+            results[index] = invalid(index, {'non_field_errors': [
+                'Вы уже оставляли отзыв на это произведение!'
+            ]})
+        else:
+            reviewed.add(author.pk)
+            reviews.append((index, Review(
+                title=title, author=author,
+                text=item['text'], score=item['score'],
+            )))
+    if not reviews:
+        return results
+    with transaction.atomic():
+        insert(Review, [review for _, review in reviews])
+        recount_titles(title_ids=[title.pk])
+        schedule_update(title.pk)
+    bump_version(CATALOG_SCOPE)
+    bump_version(f'reviews:{title.pk}')
+    for index, review in reviews:
+        results[index] = created(index, ReviewSerializer(review).data)
+    return results
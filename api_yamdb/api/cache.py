@@ -0,0 +1,138 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from hashlib import md5
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_SCOPE = 'catalog'
+USERS_SCOPE = 'users'
+STATS_KEYS = ('hits', 'misses')
+_stats = threading.local()
+
+
+def _version_key(scope):
+    return f'api:version:{scope}'
+
+
+def _initial_version():
+    # Версия стартует с текущего времени в мс, чтобы после очистки кеша
+    # не повторить номер, под которым уже лежат старые ответы.
+    return int(time.time() * 1000)
+
+
+def get_version(scope):
+    """Возвращает текущую версию данных области scope."""
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_modified(scope):
+    """Возвращает время последнего изменения области scope
+    (timestamp) или None, если оно неизвестно."""
+    return cache.get(f'api:modified:{scope}')
+
+
+def bump_version(scope):
+    """
+    Увеличивает версию области scope, делая её старые ответы
+    недоступными без перебора ключей, и запоминает время изменения.
+    Внутри транзакции версия увеличивается после её фиксации: иначе
+    параллельный GET мог бы закешировать ещё старые данные под новой
+    версией.
+    """
+    transaction.on_commit(partial(_bump_version, scope))
+
+
+def _bump_version(scope):
+    key = _version_key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), None)
+    cache.set(f'api:modified:{scope}', time.time(), None)
+
+
+def bump_versions(scopes):
+    """
+    Увеличивает версии многих областей сразу (после массовой загрузки,
+    см. api.signals.invalidate_all) пачками get_many/set_many после
+    фиксации транзакции. Области без версии пропускаются: под ними
+    в кеше ничего нет.
+    """
+    transaction.on_commit(partial(_bump_versions, scopes))
+
+
+def _bump_versions(scopes, chunk_size=1000):
+    scopes = iter(scopes)
+    modified = time.time()
+    while True:
+        keys = {_version_key(scope): scope
+                for scope in islice(scopes, chunk_size)}
+        if not keys:
+            return
+        versions = cache.get_many(keys)
+        cache.set_many(
+            {key: version + 1 for key, version in versions.items()}, None)
+        cache.set_many({f'api:modified:{keys[key]}': modified
+                        for key in versions}, None)
+
+
+def make_key(scope, request, view):
+    """Ключ ответа: версия области, путь и нормализованные параметры."""
+    query = sorted(
+        (name, sorted(values))
+        for name, values in request.query_params.lists()
+    )
+    digest = md5(
+        f'{view.basename}:{request.path}:{query}'.encode()
+    ).hexdigest()
+    return f'api:response:{scope}:{get_version(scope)}:{digest}'
+
+
+@contextmanager
+def stats_paused():
+    """Запросы внутри блока не попадают в счётчики попаданий
+    и промахов (служебные запросы прогрева, api.warmup)."""
+    _stats.paused = True
+    try:
+        yield
+    finally:
+        _stats.paused = False
+
+
+def _count(name):
+    if getattr(_stats, 'paused', False):
+        return
+    key = f'api:stats:{name}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_cached_data(key):
+    """Возвращает сохранённые данные ответа или None, считая попадания
+    и промахи."""
+    data = cache.get(key)
+    _count('misses' if data is None else 'hits')
+    return data
+
+
+def set_cached_data(key, data):
+    cache.set(key, data, settings.API_CACHE_TIMEOUT)
+
+
+def get_stats():
+    """Возвращает счётчики попаданий и промахов кеша ответов."""
+    stats = cache.get_many([f'api:stats:{name}' for name in STATS_KEYS])
+    return {name: stats.get(f'api:stats:{name}', 0) for name in STATS_KEYS}
@@ -0,0 +1,66 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY = 'default'
+
+# Реплика, выбранная ReplicaReadMixin на время обработки запроса
+# (см. choose_replica), или None - читать с основной базы.
+replica_alias = ContextVar('replica_alias', default=None)
+
+
+def _pin_key(user_id):
+    return f'api:db:pinned:{user_id}'
+
+
+def pin_to_primary(user):
+    """После записи пользователь читает с основной базы
+    API_REPLICA_PIN_SECONDS секунд, чтобы увидеть свои изменения
+    до того, как они дойдут до реплик."""
+    cache.set(_pin_key(user.pk), True, settings.API_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return bool(user.is_authenticated and cache.get(_pin_key(user.pk)))
+
+
+def choose_replica(request, safe):
+    """
+    Одна реплика на весь запрос, чтобы COUNT и строки страницы
+    читались из одной копии, или None.
+    Закрепление после записи хранится в кеше; без общего кеша
+    (API_CACHE_SHARED) другой воркер его не увидит, поэтому реплики
+    не используются.
+    """
+    if (not settings.DATABASE_REPLICAS or not settings.API_CACHE_SHARED
+            or not safe or is_pinned(request.user)):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+    """
+    Направляет чтения безопасных запросов к API на реплику, выбранную
+    для запроса из DATABASE_REPLICAS, всё остальное - на основную базу.
+    Реплики - копии основной базы, поэтому миграции применяются
+    только к ней, а связи между объектами разрешены.
+    """
+
+    def db_for_read(self, model, **hints):
+        # Связанные объекты (prefetch_related) читаются из той же базы,
+        # что и объект, как в стандартном роутере Django.
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return replica_alias.get() or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
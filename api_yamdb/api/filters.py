@@ -1,21 +1,98 @@
 import django_filters
-from reviews.models import Title
+from rest_framework.filters import BaseFilterBackend
+from reviews.models import Category, Genre, Title
+
+from .search import get_search_backend
+
+
+class SlugInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Фильтр по одному или нескольким slug через запятую."""
 
 
 class TitlesFilter(django_filters.FilterSet):
+    """
+    Фильтры произведений.
+    genre и category сравнивают slug точно и принимают несколько значений
+    через запятую. По жанрам подходит произведение хотя бы с одним из них
+    (genre_mode=any, по умолчанию) или со всеми сразу (genre_mode=all).
+    Связи проверяются подзапросами IN по уникальным индексам slug,
+    без JOIN по M2M и DISTINCT.
+    """
+    GENRE_MODES = (
+        ('any', 'Любой из жанров'),
+        ('all', 'Все жанры'),
+    )
+
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    category = django_filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
+    category = SlugInFilter(method='filter_category')
+    genre = SlugInFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=GENRE_MODES,
+        method='filter_genre_mode'
     )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    year_min = django_filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte'
+    )
+    year_max = django_filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
+    )
+    rating_min = django_filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='gte'
+    )
+    rating_max = django_filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='lte'
     )
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'genre', 'category')
+
+    def filter_category(self, queryset, name, value):
+        slugs = [slug for slug in value if slug]
+        if not slugs:
+            return queryset
+        return queryset.filter(category_id__in=Category.objects.filter(
+            slug__in=slugs
+        ).values('id'))
+
+    def filter_genre(self, queryset, name, value):
+        slugs = [slug for slug in value if slug]
+        if not slugs:
+            return queryset
+        title_genres = Title.genre.through.objects
+        if self.form.cleaned_data.get('genre_mode') == 'all':
+            groups = [[slug] for slug in set(slugs)]
+        else:
+            groups = [slugs]
+        for group in groups:
+            queryset = queryset.filter(pk__in=title_genres.filter(
+                genre_id__in=Genre.objects.filter(
+                    slug__in=group
+                ).values('id')
+            ).values('title_id'))
+        return queryset
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Учитывается в filter_genre.
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Поиск произведений по названию (?search=).
+    Результаты упорядочены по релевантности, если не передан ?ordering=.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return get_search_backend().search(queryset, query)
@@ -0,0 +1,97 @@
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """
+    Очередь исходящих писем.
+    Запрос только кладёт письмо в очередь, а фоновый поток забирает письма
+    пачками до EMAIL_QUEUE_BATCH_SIZE и отправляет пачку через одно
+    соединение get_connection(). Неотправленные письма повторяются
+    с экспоненциальной задержкой до EMAIL_QUEUE_MAX_RETRIES раз.
+    Поток запускается при первом письме, поэтому после fork у каждого
+    воркера gunicorn он свой.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def enqueue(self, message):
+        if not settings.EMAIL_QUEUE_ASYNC:
+            message.send()
+            return
+        self.queue.put(message)
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(
+                    target=self.run, name='mail-queue', daemon=True
+                )
+                self.worker.start()
+
+    def flush(self, timeout=None):
+        """Ждёт, пока очередь опустеет. Возвращает True, если успела."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < settings.EMAIL_QUEUE_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.deliver(batch)
+            except Exception:
+                logger.exception('Ошибка очереди писем')
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def deliver(self, messages):
+        for attempt in range(settings.EMAIL_QUEUE_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(settings.EMAIL_QUEUE_BACKOFF * 2 ** (attempt - 1))
+            messages = self.send(messages)
+            if not messages:
+                return
+        logger.error('Не удалось отправить писем: %d', len(messages))
+
+    def send(self, messages):
+        """Отправляет письма через одно соединение.
+        Возвращает список неотправленных."""
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception:
+            logger.warning('Нет соединения с почтовым сервером',
+                           exc_info=True)
+            return messages
+        failed = []
+        try:
+            for message in messages:
+                try:
+                    connection.send_messages([message])
+                except Exception:
+                    logger.warning('Письмо не отправлено', exc_info=True)
+                    failed.append(message)
+        finally:
+            connection.close()
+        return failed
+
+
+mail_queue = MailQueue()
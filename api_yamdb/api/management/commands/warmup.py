@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.warmup import warm_up
+
+
+class Command(BaseCommand):
+    """Прогревает резолвер URL, сериализаторы, фильтры, соединения
+    с базой и кеши и показывает время первого запроса до и после.
+    Для запуска - python manage.py warmup.
+    В воркерах gunicorn то же делает хук из gunicorn.conf.py.
+    """
+
+    help = 'Прогревает процесс и сравнивает первый запрос до и после'
+
+    def handle(self, *args, **options):
+        report = warm_up()
+        for name, value in report.items():
+            self.stdout.write(f'{name}: {value:.1f} мс')
+        self.stdout.write(self.style.SUCCESS(
+            f'Первый запрос: {report["cold_request"]:.1f} мс, '
+            f'после прогрева: {report["warm_request"]:.1f} мс'
+        ))
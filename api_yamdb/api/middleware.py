@@ -0,0 +1,143 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger('api.profiling')
+
+current_profile = ContextVar('current_profile', default=None)
+
+
+class Profile:
+    """Замеры одного запроса: число и время SQL-запросов,
+    время сериализации и работы представления."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.serializer = 0.0
+        self.serializer_depth = 0
+        self.view = None
+        self.view_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql += time.perf_counter() - started
+
+
+def _profiled_data(data):
+    def wrapper(serializer):
+        profile = current_profile.get()
+        if profile is None:
+            return data.fget(serializer)
+        profile.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            profile.serializer_depth -= 1
+            # Вложенные вызовы .data уже учтены во внешнем.
+            if not profile.serializer_depth:
+                profile.serializer += time.perf_counter() - started
+    wrapper.profiled = True
+    return property(wrapper)
+
+
+def _patch_serializers():
+    # Serializer.data и ListSerializer.data вызывают BaseSerializer.data,
+    # поэтому достаточно обернуть его.
+    if not getattr(BaseSerializer.data.fget, 'profiled', False):
+        BaseSerializer.data = _profiled_data(BaseSerializer.data)
+
+
+def view_name(view_func, method):
+    """Имя представления DRF с действием: TitleViewSet.list."""
+    view_class = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    if actions:
+        return f'{view_class.__name__}.{actions.get(method.lower(), method)}'
+    if view_class.__name__ == 'WrappedAPIView':
+        return view_func.__name__
+    return view_class.__name__
+
+
+class ProfilingMiddleware:
+    """
+    Включается настройкой API_PROFILING.
+    Для каждого запроса пишет в заголовок Server-Timing и в лог
+    api.profiling число и время SQL-запросов, время сериализации,
+    представления и общее. Запросы, превысившие API_PROFILING_MAX_QUERIES
+    или API_PROFILING_MAX_MS, логируются с уровнем WARNING.
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_PROFILING:
+            raise MiddlewareNotUsed
+        _patch_serializers()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = Profile()
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        finished = time.perf_counter()
+        timings = {
+            'db': profile.sql,
+            'serializer': profile.serializer,
+            'view': (finished - profile.view_started
+                     if profile.view_started is not None else None),
+            'total': finished - started,
+        }
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={value * 1000:.1f}'
+            + (f';desc="{profile.queries} queries"' if name == 'db' else '')
+            for name, value in timings.items() if value is not None
+        )
+        self.log(request, response, profile, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.view = view_name(view_func, request.method)
+            profile.view_started = time.perf_counter()
+
+    def log(self, request, response, profile, timings):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view': profile.view,
+            'queries': profile.queries,
+        }
+        record.update(
+            (f'{name}_ms', round(value * 1000, 1))
+            for name, value in timings.items() if value is not None
+        )
+        slow = (
+            profile.queries > settings.API_PROFILING_MAX_QUERIES
+            or record['total_ms'] > settings.API_PROFILING_MAX_MS
+        )
+        record['slow'] = slow
+        logger.log(logging.WARNING if slow else logging.INFO,
+                   json.dumps(record, ensure_ascii=False))
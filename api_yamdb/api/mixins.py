@@ -1,9 +1,271 @@
-from rest_framework import filters, mixins, viewsets
+import time
+from hashlib import md5
 
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .cache import (CATALOG_SCOPE, get_cached_data, get_modified,
+                    get_version, make_key, set_cached_data)
+from .db_router import choose_replica, pin_to_primary, replica_alias
 from .permissions import IsAdminOrReadOnly
 
 
-class GenreCategoryViewSetMixin(viewsets.GenericViewSet,
+class ReplicaReadMixin:
+    """
+    Безопасные запросы после аутентификации и проверки прав читают
+    с реплик (см. api.db_router), если пользователь недавно
+    ничего не изменял, и только с общим кешем (API_CACHE_SHARED).
+    Изменяющий запрос закрепляет пользователя за основной базой.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.replica_token = replica_alias.set(
+            choose_replica(request, request.method in SAFE_METHODS)
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'replica_token', None)
+        if token is not None:
+            replica_alias.reset(token)
+            self.replica_token = None
+        if (request.method not in SAFE_METHODS
+                and request.user.is_authenticated):
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CachedResponseMixin:
+    """
+    Кеширует данные успешных ответов на GET-запросы.
+    Ключ включает версию области cache_scope, которая увеличивается
+    при изменении данных (см. api.signals), поэтому устаревшие ответы
+    не удаляются, а перестают находиться.
+    Аутентификация и права проверяются до обращения к кешу.
+    Промах читает с основной базы: ответ с отстающей реплики попал бы
+    в кеш под новой версией и жил бы до следующей записи.
+    """
+    cache_scope = CATALOG_SCOPE
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = make_key(self.cache_scope, request, self)
+        data = get_cached_data(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        token = replica_alias.set(None)
+        try:
+            response = handler(request, *args, **kwargs)
+        finally:
+            replica_alias.reset(token)
+        if response.status_code == status.HTTP_200_OK:
+            set_cached_data(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request,
+                                        *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request,
+                                        *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Отдаёт ETag и Last-Modified для list и retrieve и отвечает 304
+    на If-None-Match/If-Modified-Since до выборки и сериализации данных.
+    Валидаторы строятся из версий областей кеша get_conditional_scopes()
+    и, если задана, статистики get_conditional_stats()
+    (последняя дата публикации и количество объектов), а не из тела ответа.
+    Работает только с общим кешем (API_CACHE_SHARED).
+    """
+
+    def get_conditional_scopes(self):
+        return [CATALOG_SCOPE]
+
+    def get_conditional_stats(self):
+        """Возвращает словарь с ключами last (datetime) и count или None."""
+        return None
+
+    def get_validators(self, request):
+        scopes = self.get_conditional_scopes()
+        stats = self.get_conditional_stats() or {}
+        source = [request.get_full_path()]
+        source.extend(get_version(scope) for scope in scopes)
+        source.extend((stats.get('count'), stats.get('last')))
+        etag = quote_etag(md5(str(source).encode()).hexdigest())
+        timestamps = [get_modified(scope) for scope in scopes]
+        if stats.get('last') is not None:
+            timestamps.append(stats['last'].timestamp())
+        if None in timestamps:
+            # Время изменения неизвестно - считаем, что данные свежие.
+            return etag, int(time.time())
+        return etag, int(max(timestamps))
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        if not settings.API_CACHE_SHARED:
+            # Версии в кеше одного процесса не видят изменений, сделанных
+            # другими воркерами, - валидаторам нельзя доверять.
+            return handler(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(super().list, request,
+                                             *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(super().retrieve, request,
+                                             *args, **kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    Урезает ответ на GET-запрос до полей из ?fields=id,name,rating
+    или без полей из ?omit=description (имена через запятую).
+    Выборка урезается вместе с ответом: в only() попадают только поля
+    модели, нужные оставленным полям сериализатора и
+    sparse_required_fields, а select_related и prefetch_related
+    пропущенных связей отбрасываются.
+    Сериализатор должен наследовать SparseFieldsSerializerMixin.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    # Поля модели, которые нужны самому представлению (например,
+    # ключ курсорной пагинации).
+    sparse_required_fields = ()
+
+    def get_sparse_fields(self):
+        """Имена оставленных полей ответа или None, если ответ
+        не урезается."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        params = self.request.query_params
+        if (self.request.method not in SAFE_METHODS
+                or not {self.fields_query_param,
+                        self.omit_query_param} & set(params)):
+            return None
+        available = list(self.get_serializer_class()().fields)
+        requested = {}
+        for param in (self.fields_query_param, self.omit_query_param):
+            requested[param] = {
+                name.strip() for name in params.get(param, '').split(',')
+                if name.strip()
+            }
+            unknown = requested[param] - set(available)
+            if unknown:
+                raise ValidationError({param: [
+                    f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+                ]})
+        included = requested[self.fields_query_param] or set(available)
+        return [
+            name for name in available
+            if name in included
+            and name not in requested[self.omit_query_param]
+        ]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fields'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        names = self.get_sparse_fields()
+        if names is None:
+            return queryset
+        return self.sparse_queryset(queryset, names)
+
+    def sparse_queryset(self, queryset, names):
+        fields = self.get_serializer_class()().fields
+        sources = {fields[name].source.split('.')[0] for name in names}
+        only = set(self.sparse_required_fields)
+        for source in sources:
+            try:
+                field = queryset.model._meta.get_field(source)
+            except FieldDoesNotExist:
+                # Поле сериализатора вычисляется (source='*', свойство
+                # модели) - неизвестно, какие поля модели ему нужны.
+                return queryset
+            if not field.many_to_many and not field.one_to_many:
+                only.add(source)
+        selected = queryset.query.select_related
+        if isinstance(selected, dict):
+            queryset = queryset.select_related(None).select_related(
+                *[name for name in selected if name in sources]
+            )
+        prefetched = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+            in sources
+        ]
+        queryset = queryset.prefetch_related(None).prefetch_related(
+            *prefetched)
+        return queryset.only(*only)
+
+
+class FastReadMixin:
+    """
+    Отдаёт list и retrieve через reader_class (см. api.readers)
+    вместо сериализатора: страница читается кортежами values_list().
+    Права на объект не проверяются, поэтому подходит только для
+    представлений, где чтение разрешено всем.
+    """
+    reader_class = None
+
+    def get_reader(self):
+        sparse = getattr(self, 'get_sparse_fields', None)
+        return self.reader_class(sparse() if sparse else None)
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_reader()
+        queryset = reader.prepare(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                reader.to_representation(page))
+        return Response(reader.to_representation(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        reader = self.get_reader()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = reader.prepare(self.filter_queryset(
+            self.get_queryset()
+        ).filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}))
+        data = reader.to_representation(queryset[:1])
+        if not data:
+            raise NotFound()
+        return Response(data[0])
+
+
+class GenreCategoryViewSetMixin(ReplicaReadMixin,
+                                CachedListMixin,
+                                viewsets.GenericViewSet,
                                 mixins.ListModelMixin,
                                 mixins.CreateModelMixin,
                                 mixins.DestroyModelMixin,):
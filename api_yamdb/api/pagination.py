@@ -0,0 +1,140 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       _positive_int)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PubDateKeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по ключу (pub_date, id).
+    Страница выбирается условием по ключу вместо OFFSET и без COUNT(*),
+    поэтому время ответа не зависит от глубины листания.
+    Курсор непрозрачен для клиента и передаётся в ссылках next/previous.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor[0]
+        if reverse:
+            queryset = queryset.order_by('-pub_date', '-id')
+        else:
+            queryset = queryset.order_by('pub_date', 'id')
+        if self.cursor is not None:
+            reverse, pub_date, pk = self.cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+                )
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            reverse, pub_date, pk = b64decode(
+                encoded.encode('ascii'), altchars=b'-_'
+            ).decode('ascii').split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None or reverse not in ('0', '1'):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse == '1', pub_date, pk
+
+    def encode_cursor(self, reverse, pub_date, pk):
+        cursor = f'{int(reverse)}|{pub_date.isoformat()}|{pk}'
+        encoded = b64encode(cursor.encode('ascii'), altchars=b'-_')
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encoded.decode('ascii')
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Пустая страница при листании назад: следующая - начало списка.
+            return remove_query_param(self.request.build_absolute_uri(),
+                                      self.cursor_query_param)
+        return self.encode_cursor(False, self.page[-1].pub_date,
+                                  self.page[-1].pk)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor(True, *self.cursor[1:])
+        return self.encode_cursor(True, self.page[0].pub_date,
+                                  self.page[0].pk)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class ReviewCommentPagination(LimitOffsetPagination):
+    """
+    Пагинация отзывов и комментариев.
+    По умолчанию - limit/offset, как во всём API.
+    Курсорная пагинация включается параметром ?pagination=cursor
+    (или переданным курсором ?cursor=...).
+    """
+    mode_query_param = 'pagination'
+    keyset_class = PubDateKeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        keyset = self.keyset_class()
+        if (request.query_params.get(self.mode_query_param) == 'cursor'
+                or keyset.cursor_query_param in request.query_params):
+            self.keyset = keyset
+            return keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
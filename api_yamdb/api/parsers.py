@@ -0,0 +1,39 @@
+import codecs
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+# orjson читает целые за пределами 64 бит как float, поэтому тела
+# с длинными числами разбирает стандартный json. Цифры заменяются на 0,
+# остальные байты - на пробел: bytes.translate и поиск подстроки
+# быстрее регулярного выражения.
+DIGITS = bytes(ord('0') if ord('0') <= byte <= ord('9') else ord(' ')
+               for byte in range(256))
+LONG_NUMBER = b'0' * 19
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser на orjson, если он установлен и тело запроса в UTF-8.
+    Тела с числами из 19 и более цифр и тела, которые orjson
+    не разобрал (ошибка в JSON, NaN при STRICT_JSON=False), разбираются
+    стандартным JSONParser, поэтому результат и сообщения об ошибках
+    те же.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding',
+                                              settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        data = stream.read()
+        if LONG_NUMBER in data.translate(DIGITS):
+            return super().parse(BytesIO(data), media_type, parser_context)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(data), media_type, parser_context)
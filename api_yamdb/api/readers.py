@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+from reviews.models import Genre, Title
+
+
+class TitleReader:
+    """
+    Быстрое чтение произведений для GET-запросов: строит те же словари,
+    что и GetTitleSerializer, из кортежей values_list() без создания
+    объектов моделей и вложенных сериализаторов.
+    Категория читается соединением в том же запросе, жанры всей
+    страницы - одним запросом к связующей таблице.
+    names - оставленные поля ответа (см. SparseFieldsMixin),
+    None - все поля.
+    """
+    fields = ('id', 'category', 'genre', 'rating', 'name', 'year',
+              'description', 'reviews_count')
+    columns = {
+        'id': ('id',),
+        'category': ('category__name', 'category__slug'),
+        'genre': (),
+        'rating': ('rating',),
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'reviews_count': ('reviews_count',),
+    }
+
+    def __init__(self, names=None):
+        self.names = [name for name in self.fields
+                      if names is None or name in names]
+        self.values = ['id']
+        for name in self.names:
+            self.values.extend(
+                column for column in self.columns[name]
+                if column not in self.values
+            )
+
+    def prepare(self, queryset):
+        """Выборка кортежей values_list() для пагинации."""
+        return queryset.prefetch_related(None).values_list(*self.values)
+
+    def get_genres(self, ids):
+        """Жанры произведений ids: словарь {id: [{name, slug}, ...]}
+        в порядке сортировки модели Genre, как в prefetch_related."""
+        genres = defaultdict(list)
+        rows = Title.genre.through.objects.filter(
+            title_id__in=ids
+        ).order_by(*[
+            f'genre__{field}' for field in Genre._meta.ordering
+        ]).values_list('title_id', 'genre__name', 'genre__slug')
+        for title_id, name, slug in rows:
+            genres[title_id].append({'name': name, 'slug': slug})
+        return genres
+
+    def to_representation(self, rows):
+        rows = [dict(zip(self.values, row)) for row in rows]
+        if 'genre' in self.names:
+            genres = self.get_genres([row['id'] for row in rows])
+        data = []
+        for row in rows:
+            item = {}
+            for name in self.names:
+                if name == 'category':
+                    item[name] = None if row['category__slug'] is None else {
+                        'name': row['category__name'],
+                        'slug': row['category__slug'],
+                    }
+                elif name == 'genre':
+                    item[name] = genres.get(row['id'], [])
+                elif name == 'rating':
+                    item[name] = (None if row['rating'] is None
+                                  else int(row['rating']))
+                else:
+                    item[name] = row[name]
+            data.append(item)
+        return data
@@ -0,0 +1,45 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson выводит U+2028 и U+2029 как есть, JSONRenderer - экранирует.
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'),
+                   (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson, если он установлен.
+    Вывод совпадает с JSONRenderer побайтно, кроме float: компактные
+    разделители, русский текст без \\u-экранирования, даты и время,
+    Decimal, ленивые строки и прочие нестандартные типы - через тот же
+    encoder_class. Отступы (?format=api, indent в Accept), ensure_ascii
+    и данные, которые orjson не кодирует (целые больше 64 бит), отдаются
+    стандартному JSONRenderer. Без orjson класс равен JSONRenderer.
+    Float с экспонентой orjson пишет короче (1e16 вместо 1e+16, 1e-7
+    вместо 1e-07), а NaN и бесконечности выводит как null, где
+    JSONRenderer вызывает ошибку. Сериализаторы API таких чисел
+    не отдают: рейтинг - целое, см. GetTitleSerializer.
+    """
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+               | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii
+                or not self.compact
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        for separator, escaped in LINE_SEPARATORS:
+            ret = ret.replace(separator, escaped)
+        return ret
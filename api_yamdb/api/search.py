@@ -0,0 +1,153 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+from django.utils.module_loading import import_string
+from reviews.models import Title
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Разбивает текст на слова в нижнем регистре."""
+    return TOKEN_RE.findall((text or '').lower().replace('ё', 'е'))
+
+
+class PostgresTitleSearch:
+    """
+    Полнотекстовый поиск средствами PostgreSQL.
+    Выражение to_tsvector совпадает с выражением GIN-индекса
+    reviews_title_name_fts_idx (см. миграцию 0005), поэтому
+    поиск идёт по индексу, а не перебором строк.
+    """
+    config = 'russian'
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                    SearchVector)
+
+        vector = SearchVector('name', config=self.config)
+        search_query = SearchQuery(query, config=self.config)
+        return queryset.annotate(search=vector).filter(
+            search=search_query
+        ).annotate(
+            search_rank=SearchRank(vector, search_query)
+        ).order_by('-search_rank', 'name')
+
+    def update(self, title):
+        pass
+
+    def remove(self, title_id):
+        pass
+
+
+class InMemoryTitleSearch:
+    """
+    Инвертированный индекс названий в памяти процесса для баз без
+    полнотекстового поиска.
+    Строится при первом поиске и поддерживается сигналами сохранения
+    и удаления Title. Изменения, сделанные другими процессами, индекс
+    не видит - это запасной вариант для разработки и тестов.
+    Слово запроса, совпавшее целиком, весит 2, совпавшее как префикс - 1.
+    """
+    max_results = 1000
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.postings = None
+        self.title_tokens = {}
+        self.vocabulary = None
+
+    def build(self):
+        postings = defaultdict(set)
+        title_tokens = {}
+        for title_id, name in Title.objects.values_list(
+                'id', 'name').iterator():
+            tokens = set(tokenize(name))
+            title_tokens[title_id] = tokens
+            for token in tokens:
+                postings[token].add(title_id)
+        self.postings, self.title_tokens = postings, title_tokens
+        self.vocabulary = None
+
+    def update(self, title):
+        with self.lock:
+            if self.postings is None:
+                return
+            self._remove(title.pk)
+            tokens = set(tokenize(title.name))
+            self.title_tokens[title.pk] = tokens
+            for token in tokens:
+                if token not in self.postings:
+                    self.vocabulary = None
+                self.postings[token].add(title.pk)
+
+    def remove(self, title_id):
+        with self.lock:
+            if self.postings is not None:
+                self._remove(title_id)
+
+    def _remove(self, title_id):
+        for token in self.title_tokens.pop(title_id, ()):
+            title_ids = self.postings[token]
+            title_ids.discard(title_id)
+            if not title_ids:
+                del self.postings[token]
+                self.vocabulary = None
+
+    def rank(self, query):
+        """Возвращает словарь {id произведения: релевантность}."""
+        with self.lock:
+            if self.postings is None:
+                self.build()
+            if self.vocabulary is None:
+                self.vocabulary = sorted(self.postings)
+            scores = defaultdict(int)
+            for word in set(tokenize(query)):
+                position = bisect_left(self.vocabulary, word)
+                for token in self.vocabulary[position:]:
+                    if not token.startswith(word):
+                        break
+                    weight = 2 if token == word else 1
+                    for title_id in self.postings[token]:
+                        scores[title_id] += weight
+        return scores
+
+    def search(self, queryset, query):
+        scores = self.rank(query)
+        best = sorted(scores, key=scores.get, reverse=True)[:self.max_results]
+        if not best:
+            return queryset.none()
+        by_score = defaultdict(list)
+        for title_id in best:
+            by_score[scores[title_id]].append(title_id)
+        return queryset.filter(pk__in=best).annotate(search_rank=Case(
+            *[When(pk__in=title_ids, then=Value(score))
+              for score, title_ids in by_score.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )).order_by('-search_rank', 'name')
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    Возвращает движок поиска произведений: из настройки
+    TITLE_SEARCH_BACKEND, иначе выбирает его по типу базы данных.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'TITLE_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'postgresql':
+            _backend = PostgresTitleSearch()
+        else:
+            _backend = InMemoryTitleSearch()
+    return _backend
@@ -1,9 +1,9 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
-from reviews.models import Category, Comments, Genre, Review, Title, User
+from reviews.models import (Category, Comments, Genre, LeaderboardEntry,
+                            Review, ScoreHistogram, Title, User)
 from reviews.validators import validate_username
 
 
@@ -50,10 +50,24 @@ class GetTokenSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=settings.USERNAME_M_LENGTH,)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class SparseFieldsSerializerMixin:
+    """Оставляет только поля из context['sparse_fields']
+    (см. api.mixins.SparseFieldsMixin)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = self.context.get('sparse_fields')
+        if names is not None:
+            for name in set(self.fields) - set(names):
+                self.fields.pop(name)
+
+
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     """
     Сериализатор для работы с объектами Review.
-    Использует кастомный метод validate().
+    Повторный отзыв автора на произведение отсекается ограничением
+    unique_review (см. ReviewViewSet.perform_create).
     """
 
     author = serializers.SlugRelatedField(
@@ -69,27 +83,13 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         fields = ('id', 'text', 'title',
-                  'author', 'score', 'pub_date')
+                  'author', 'score', 'pub_date', 'comments_count')
         model = Review
         read_only_fields = ('title',)
 
-    def validate(self, data):
-        """
-        Не допускает создания 2 отзывов одним автором
-        на одно произведение.
-        """
-        if self.context.get('request').method == 'POST':
-            title_id = self.context['view'].kwargs.get('title_id')
-            author = self.context.get('request').user
-            title = get_object_or_404(Title, id=title_id)
-            if title.reviews.filter(author=author).exists():
-                raise serializers.ValidationError(
-                    'Вы уже оставляли отзыв на это произведение!'
-                )
-        return data
-
-
-class CommentSerializer(serializers.ModelSerializer):
+
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для работы с объектами Review."""
 
     author = serializers.SlugRelatedField(
@@ -134,12 +134,83 @@ class CreateUpdateTitleSerializer(serializers.ModelSerializer):
         return GetTitleSerializer(instance).data
 
 
-class GetTitleSerializer(serializers.ModelSerializer):
+class GetTitleSerializer(SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('score_sum',)
         model = Title
         read_only_fields = ('__all__',)
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    position = serializers.IntegerField(read_only=True)
+    title = GetTitleSerializer(read_only=True)
+
+    class Meta:
+        fields = ('position', 'score', 'title')
+        model = LeaderboardEntry
+
+
+class ScoreHistogramSerializer(serializers.ModelSerializer):
+    """Распределение оценок произведения, средняя оценка и количество."""
+    histogram = serializers.SerializerMethodField()
+    mean = serializers.SerializerMethodField()
+    count = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('histogram', 'mean', 'count')
+        model = ScoreHistogram
+
+    def get_histogram(self, obj):
+        return {
+            str(score): number for score, number in enumerate(obj.counts, 1)
+        }
+
+    def get_count(self, obj):
+        return sum(obj.counts)
+
+    def get_mean(self, obj):
+        count = self.get_count(obj)
+        if not count:
+            return None
+        return sum(
+            score * number for score, number in enumerate(obj.counts, 1)
+        ) / count
+
+
+class BulkTitleSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор элемента пакетного создания произведений.
+    Жанры и категория принимаются как slug без запросов к базе:
+    они проверяются сразу для всего пакета (см. api.bulk).
+    """
+    category = serializers.SlugField(max_length=settings.SLUG_M_LENGTH)
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=settings.SLUG_M_LENGTH)
+    )
+
+    class Meta:
+        fields = ('name', 'year', 'description', 'genre', 'category')
+        model = Title
+
+
+class BulkReviewSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор элемента пакетного создания отзывов.
+    Автор передаётся по username и проверяется сразу для всего пакета.
+    """
+    author = serializers.CharField(max_length=settings.USERNAME_M_LENGTH)
+    score = serializers.IntegerField(
+        validators=[
+            MinValueValidator(1, message='Оценка не может быть меньше 1!'),
+            MaxValueValidator(10, message='Оценка не может быть больше 10!')
+        ]
+    )
+
+    class Meta:
+        fields = ('author', 'text', 'score')
+        model = Review
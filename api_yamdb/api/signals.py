@@ -0,0 +1,88 @@
+from functools import partial
+from itertools import chain
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Comments, Genre, Review, Title, User
+from reviews.signals import bulk_loaded, deleting
+
+from .authentication import invalidate_user
+from .cache import CATALOG_SCOPE, USERS_SCOPE, bump_version, bump_versions
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    """Обновляет название произведения в индексе поиска."""
+    get_search_backend().update(instance)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    """Удаляет произведение из индекса поиска."""
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_catalog(sender, **kwargs):
+    """Сбрасывает кеш ответов каталога при изменении его данных."""
+    bump_version(CATALOG_SCOPE)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    """Меняет валидаторы ответов со списком отзывов произведения."""
+    bump_version(f'reviews:{instance.title_id}')
+
+
+@receiver(post_save, sender=Comments)
+@receiver(post_delete, sender=Comments)
+def invalidate_comments(sender, instance, **kwargs):
+    """
+    Меняет валидаторы ответов со списком комментариев отзыва и,
+    так как в отзывах выводится количество комментариев, со списком
+    отзывов произведения. Удаление отзыва сбрасывает их само.
+    """
+    bump_version(f'comments:{instance.review_id}')
+    if instance.review_id not in deleting('reviews'):
+        bump_version(f'reviews:{instance.review.title_id}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authors(sender, **kwargs):
+    """Имена авторов входят в отзывы и комментарии."""
+    bump_version(USERS_SCOPE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user(sender, instance, **kwargs):
+    """Роль и статус пользователя берутся из кеша аутентификации.
+    Запись удаляется после фиксации транзакции: иначе параллельный
+    запрос успел бы снова закешировать старую роль."""
+    transaction.on_commit(partial(invalidate_user, instance.pk))
+
+
+@receiver(bulk_loaded)
+def invalidate_all(sender, **kwargs):
+    """После массовой загрузки меняются все области кеша ответов:
+    каталог, авторы, отзывы каждого произведения и комментарии
+    каждого отзыва."""
+    bump_versions(chain(
+        (CATALOG_SCOPE, USERS_SCOPE),
+        (f'reviews:{pk}' for pk in Title.objects.values_list(
+            'pk', flat=True).iterator()),
+        (f'comments:{pk}' for pk in Review.objects.values_list(
+            'pk', flat=True).iterator()),
+    ))
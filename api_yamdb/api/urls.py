@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentsViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserEditViewSet, get_token,
-                    register_or_confirm_code)
+                    LeaderboardViewSet, ReviewViewSet, TitleViewSet,
+                    UserEditViewSet, get_token, register_or_confirm_code)
 
 router_v1 = DefaultRouter()
 router_v1.register(r'users', UserEditViewSet, basename='users')
@@ -20,6 +20,11 @@ router_v1.register(
 )
 router_v1.register(r'categories', CategoryViewSet, basename='categories')
 router_v1.register(r'genres', GenreViewSet, basename='genres')
+router_v1.register(
+    r'leaderboards',
+    LeaderboardViewSet,
+    basename='leaderboards'
+)
 
 extra_patterns = [
     path('signup/', register_or_confirm_code, name='register_or_code'),
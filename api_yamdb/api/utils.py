@@ -1,16 +1,42 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
+
+from .mail import mail_queue
+from .renderers import ORJSONRenderer
 
 
 def send_confirmation_code(user):
-    """Функция для отправки кода подтверждения"""
+    """Функция для отправки кода подтверждения.
+    Письмо ставится в очередь и отправляется в фоне (см. api.mail)."""
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    mail_queue.enqueue(EmailMessage(
         subject='Hallo from YaMDb',
-        message=(
+        body=(
             f'Код подтверждения(confirmation_code): {confirmation_code}\n'
             'Используйте его для получения своего токена'
         ),
-        from_email=None,
-        recipient_list=[user.email],
-    )
+        to=[user.email],
+    ))
+
+
+def iter_ndjson(queryset, serializer_class, chunk_size=500):
+    """
+    Построчно отдаёт объекты queryset в формате NDJSON.
+    Объекты выбираются пачками по возрастанию pk (без OFFSET),
+    prefetch_related выполняется для каждой пачки отдельно,
+    поэтому память не зависит от размера таблицы.
+    """
+    renderer = ORJSONRenderer()
+    last_pk = None
+    queryset = queryset.order_by('pk')
+    while True:
+        page = queryset
+        if last_pk is not None:
+            page = queryset.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1].pk
+        for data in serializer_class(chunk, many=True).data:
+            yield renderer.render(data)
+            yield b'\n'
@@ -1,24 +1,37 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.leaderboards import OVERALL, category_board, genre_board
+from reviews.models import (Category, Genre, LeaderboardEntry, Review,
+                            ScoreHistogram, Title, User)
 
-from .filters import TitlesFilter
-from .mixins import GenreCategoryViewSetMixin
+from .bulk import bulk_create_reviews, bulk_create_titles
+from .cache import USERS_SCOPE
+from .filters import TitleSearchFilter, TitlesFilter
+from .mixins import (CachedListMixin, CachedRetrieveMixin,
+                     ConditionalGetMixin, FastReadMixin,
+                     GenreCategoryViewSetMixin, ReplicaReadMixin,
+                     SparseFieldsMixin)
+from .pagination import ReviewCommentPagination
 from .permissions import (IsAdmin, IsAdminModerAuthorOrReadOnly,
                           IsAdminOrReadOnly)
+from .readers import TitleReader
 from .serializers import (AdminUserEditSerializer, CategorySerializer,
                           CommentSerializer, CreateUpdateTitleSerializer,
                           EditForUserSerializer, GenreSerializer,
                           GetTitleSerializer, GetTokenSerializer,
-                          ReviewSerializer, UserSignupSerializer)
-from .utils import send_confirmation_code
+                          LeaderboardEntrySerializer, ReviewSerializer,
+                          ScoreHistogramSerializer, UserSignupSerializer)
+from .utils import iter_ndjson, send_confirmation_code
 
 
 @api_view(['post'])
@@ -63,7 +76,20 @@ def get_token(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserEditViewSet(viewsets.ModelViewSet):
+def bulk_response(results):
+    """Ответ пакетного создания: 201, если созданы все элементы,
+    207 - если часть, 400 - если ни одного."""
+    statuses = {result['status'] for result in results}
+    if statuses == {'created'}:
+        code = status.HTTP_201_CREATED
+    elif 'created' in statuses:
+        code = status.HTTP_207_MULTI_STATUS
+    else:
+        code = status.HTTP_400_BAD_REQUEST
+    return Response(results, status=code)
+
+
+class UserEditViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Вьюсет для получения списка пользователей, их регистрации
     и редактирования, а также для получения пользователем данных о себе и их
     изменение."""
@@ -90,42 +116,119 @@ class UserEditViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, ConditionalGetMixin,
+                    SparseFieldsMixin, viewsets.ModelViewSet):
     """
     Вьюсет для работы с объектами Review.
-    Методы perform_create, perform_update и perform_destroy
-    переопределены для автоматического рассчета рейтинга связанного
-    объекта Title.
+    Произведение из URL запрашивается один раз за запрос.
+    Повторный отзыв автора отсекается ограничением unique_review
+    без отдельной проверки в базе.
+    Методы perform_create, perform_update и perform_destroy выполняются
+    в транзакции, чтобы запись отзыва и пересчёт счётчиков рейтинга
+    связанного объекта Title (см. reviews.signals) применялись вместе.
+    Сортировка ?ordering=-comments_count ("самые обсуждаемые") идёт
+    по счётчику Review.comments_count; курсорная пагинация всегда
+    упорядочивает по дате.
     """
 
     permission_classes = [IsAdminModerAuthorOrReadOnly]
     serializer_class = ReviewSerializer
+    pagination_class = ReviewCommentPagination
+    filter_backends = (filters.OrderingFilter,)
+    ordering_fields = ('pub_date', 'score', 'comments_count')
+    sparse_required_fields = ('pub_date',)
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs['title_id'])
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, id=self.kwargs['title_id'])
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
+
+    def get_conditional_scopes(self):
+        return [f'reviews:{self.kwargs["title_id"]}', USERS_SCOPE]
+
+    def get_conditional_stats(self):
+        return self.get_title().reviews.aggregate(
+            last=Max('pub_date'), count=Count('pk')
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user,
+                                title=self.get_title())
+        except IntegrityError:
+            # Другие нарушения ограничений - не повторный отзыв.
+            if not self.get_title().reviews.filter(
+                    author=self.request.user).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы уже оставляли отзыв на это произведение!'
+                ]
+            })
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
 
-class CommentsViewSet(viewsets.ModelViewSet):
-    """Вьюсет для работы с объектами Comment."""
+    @action(methods=['post'], detail=False, url_path='bulk',
+            permission_classes=[IsAdminOrReadOnly])
+    def bulk(self, request, title_id=None):
+        """Пакетное создание отзывов (для синхронизации каталога)."""
+        results = bulk_create_reviews(self.get_title(), request.data)
+        return bulk_response(results)
+
+
+class CommentsViewSet(ReplicaReadMixin, ConditionalGetMixin,
+                      SparseFieldsMixin, viewsets.ModelViewSet):
+    """
+    Вьюсет для работы с объектами Comment.
+    Отзыв из URL запрашивается один раз за запрос одним запросом,
+    проверяющим и review_id, и title_id.
+    Комментарий создаётся и удаляется в одной транзакции со сдвигом
+    счётчика комментариев отзыва.
+    """
 
     permission_classes = [IsAdminModerAuthorOrReadOnly]
     serializer_class = CommentSerializer
+    pagination_class = ReviewCommentPagination
+    sparse_required_fields = ('pub_date',)
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs['review_id'])
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'],
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
+    def get_conditional_scopes(self):
+        return [f'comments:{self.kwargs["review_id"]}', USERS_SCOPE]
+
+    def get_conditional_stats(self):
+        return self.get_review().comments.aggregate(
+            last=Max('pub_date'), count=Count('pk')
+        )
+
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+
 
 class CategoryViewSet(GenreCategoryViewSetMixin):
     queryset = Category.objects.all()
@@ -137,15 +240,93 @@ class GenreViewSet(GenreCategoryViewSetMixin):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+class TitleViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedListMixin,
+                   CachedRetrieveMixin, FastReadMixin, SparseFieldsMixin,
+                   viewsets.ModelViewSet):
+    """
+    Вьюсет для работы с объектами Title.
+    list и retrieve строят ответ через TitleReader (тот же формат,
+    что у GetTitleSerializer) без создания объектов моделей.
+    """
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = (filters.OrderingFilter, DjangoFilterBackend)
+    filter_backends = (TitleSearchFilter, filters.OrderingFilter,
+                       DjangoFilterBackend)
     filterset_class = TitlesFilter
-    ordering_fields = ('name',)
+    ordering_fields = ('name', 'year', 'rating', 'reviews_count')
+    lookup_value_regex = r'\d+'
+    reader_class = TitleReader
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return GetTitleSerializer
 
         return CreateUpdateTitleSerializer
+
+    @action(methods=['post'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        """Пакетное создание произведений (для синхронизации каталога)."""
+        return bulk_response(bulk_create_titles(request.data))
+
+    @action(methods=['get'], detail=True, url_path='ratings')
+    def ratings(self, request, pk=None):
+        """Распределение оценок произведения из счётчиков
+        ScoreHistogram, без чтения отзывов."""
+        histogram = ScoreHistogram.objects.filter(title_id=pk).first()
+        if histogram is None:
+            histogram = ScoreHistogram(title=get_object_or_404(Title, pk=pk))
+        return Response(ScoreHistogramSerializer(histogram).data)
+
+    @action(methods=['get'], detail=False, url_path='export',
+            permission_classes=[IsAdmin])
+    def export(self, request):
+        """Потоковая выгрузка всего каталога в формате NDJSON.
+        Тело читается уже после finalize_response, поэтому база
+        выбирается здесь: выгрузка остаётся на реплике."""
+        queryset = self.queryset.using(router.db_for_read(Title))
+        return StreamingHttpResponse(
+            iter_ndjson(queryset, GetTitleSerializer),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+
+
+class LeaderboardViewSet(ReplicaReadMixin, viewsets.GenericViewSet):
+    """
+    Рейтинги лучших произведений по байесовской оценке: общий,
+    по жанру и по категории.
+    Рейтинги хранятся готовыми (см. reviews.leaderboards), страница
+    читается одним запросом по индексу (board, -score, title).
+    """
+    serializer_class = LeaderboardEntrySerializer
+    board = OVERALL
+
+    def get_queryset(self):
+        return LeaderboardEntry.objects.filter(
+            board=self.board
+        ).select_related('title__category').prefetch_related(
+            'title__genre'
+        ).order_by('-score', 'title_id')
+
+    def board_response(self, board):
+        self.board = board
+        page = self.paginate_queryset(self.get_queryset())
+        start = getattr(self.paginator, 'offset', 0) + 1
+        for position, entry in enumerate(page, start):
+            entry.position = position
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def list(self, request):
+        return self.board_response(OVERALL)
+
+    @action(detail=False, url_path=r'genres/(?P<slug>[-\w]+)')
+    def genre(self, request, slug=None):
+        genre = get_object_or_404(Genre, slug=slug)
+        return self.board_response(genre_board(genre.pk))
+
+    @action(detail=False, url_path=r'categories/(?P<slug>[-\w]+)')
+    def category(self, request, slug=None):
+        category = get_object_or_404(Category, slug=slug)
+        return self.board_response(category_board(category.pk))
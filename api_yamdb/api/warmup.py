@@ -0,0 +1,109 @@
+import inspect
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import get_resolver
+from rest_framework.serializers import BaseSerializer
+from reviews.models import Title
+
+from . import serializers
+from .cache import stats_paused
+from .search import get_search_backend
+from .urls import router_v1
+
+logger = logging.getLogger(__name__)
+
+# Справочные списки: их ответы кладутся в кеш при прогреве.
+WARMUP_URLS = ('/api/v1/categories/', '/api/v1/genres/', '/api/v1/titles/')
+
+
+def build_urls():
+    """Собирает маршруты router_v1 и компилирует регулярные
+    выражения резолвера."""
+    router_v1.urls
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for url in WARMUP_URLS:
+        resolver.resolve(url)
+
+
+def build_serializers():
+    """Заполняет поля всех сериализаторов API: при первом обращении
+    DRF разбирает модели, и это самая дорогая часть первого запроса."""
+    for _, serializer_class in inspect.getmembers(serializers,
+                                                  inspect.isclass):
+        if (issubclass(serializer_class, BaseSerializer)
+                and serializer_class.__module__ == serializers.__name__):
+            serializer_class(context={}).fields
+
+
+def build_filtersets():
+    for _, viewset, _ in router_v1.registry:
+        filterset_class = getattr(viewset, 'filterset_class', None)
+        if filterset_class is not None:
+            filterset_class(
+                data={}, queryset=filterset_class._meta.model.objects.none()
+            ).form
+
+
+def persistent_connections():
+    """Базы с постоянными соединениями: при CONN_MAX_AGE=0 соединение
+    закрывается в начале первого же запроса, открывать его заранее
+    бесполезно."""
+    return [alias for alias in connections
+            if connections[alias].settings_dict.get('CONN_MAX_AGE')]
+
+
+def connect_databases():
+    for alias in persistent_connections():
+        connections[alias].ensure_connection()
+
+
+def prime_caches(client):
+    """Строит индекс поиска и кладёт справочные списки в кеш ответов."""
+    get_search_backend().search(Title.objects.none(), 'прогрев')
+    for url in WARMUP_URLS:
+        client.get(url)
+
+
+def timed_get(client, url):
+    started = time.perf_counter()
+    client.get(url)
+    return (time.perf_counter() - started) * 1000
+
+
+def warm_up(connect=True):
+    """
+    Прогревает процесс перед первыми запросами.
+    При connect=False не трогает базу и кеш (для прогрева в мастере
+    gunicorn до fork, соединения с базой нельзя делить между воркерами).
+    Возвращает время каждого шага и первого запроса к WARMUP_URLS[0]
+    до и после прогрева, в мс. Запросы прогрева не учитываются
+    в статистике кеша ответов.
+    """
+    client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+    steps = [
+        ('build_urls', build_urls),
+        ('build_serializers', build_serializers),
+        ('build_filtersets', build_filtersets),
+    ]
+    report = {}
+    if connect:
+        steps.append(('prime_caches', lambda: prime_caches(client)))
+        if persistent_connections():
+            steps.append(('connect_databases', connect_databases))
+    with stats_paused():
+        if connect:
+            report['cold_request'] = timed_get(client, WARMUP_URLS[0])
+        for name, step in steps:
+            started = time.perf_counter()
+            step()
+            report[name] = (time.perf_counter() - started) * 1000
+        if connect:
+            report['warm_request'] = timed_get(client, WARMUP_URLS[0])
+    logger.info('Прогрев: %s', ', '.join(
+        f'{name} {value:.1f} мс' for name, value in report.items()))
+    return report
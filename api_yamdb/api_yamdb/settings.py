@@ -29,6 +29,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +71,58 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: DB_REPLICAS - хосты через запятую
+# (для SQLite - пути к файлам копий базы). Используются только с общим
+# кешем (API_CACHE_SHARED): в нём хранится закрепление за основной базой.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1):
+    alias = f'replica_{number}'
+    location = 'NAME' if DATABASES['default']['ENGINE'].endswith(
+        'sqlite3') else 'HOST'
+    DATABASES[alias] = dict(DATABASES['default'], **{
+        location: replica.strip(),
+        'TEST': {'MIRROR': 'default'},
+    })
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+
+API_REPLICA_PIN_SECONDS = int(
+    os.getenv('API_REPLICA_PIN_SECONDS', default=10)
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+# Версии ответов (api.cache) и кеш пользователей аутентификации
+# сбрасываются через кеш, поэтому при нескольких воркерах он должен быть
+# общим (memcached в infra/docker-compose.yaml). LocMemCache виден только
+# своему процессу: с ним условные GET и кеш пользователей отключены,
+# а кешированные ответы других воркеров устаревают на API_CACHE_TIMEOUT.
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+API_CACHE_SHARED = os.getenv(
+    'API_CACHE_SHARED',
+    default=str(CACHES['default']['BACKEND'] not in PER_PROCESS_CACHES),
+) == 'True'
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=60))
+
+API_BULK_LIMIT = 1000
+
+# Рейтинги лучших произведений (reviews.leaderboards).
+LEADERBOARD_SIZE = 100
+LEADERBOARD_MIN_REVIEWS = 1
+LEADERBOARD_PRIOR_REVIEWS = 10
+LEADERBOARD_PRIOR_MEAN = 6.0
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -112,13 +165,28 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = os.getenv('EMAIL_PORT')
 
+EMAIL_QUEUE_ASYNC = os.getenv('EMAIL_QUEUE_ASYNC', default='True') == 'True'
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_MAX_RETRIES = 5
+EMAIL_QUEUE_BACKOFF = 1
+
 
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ),
+    # orjson, если установлен; без него - стандартный json (api.renderers).
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
@@ -131,6 +199,26 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+API_PROFILING = os.getenv('API_PROFILING', default='False') == 'True'
+API_PROFILING_MAX_QUERIES = int(
+    os.getenv('API_PROFILING_MAX_QUERIES', default=20)
+)
+API_PROFILING_MAX_MS = int(os.getenv('API_PROFILING_MAX_MS', default=500))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.profiling': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+AUTH_USER_CACHE_TIMEOUT = 300
+AUTH_TOKEN_CACHE_SIZE = 1024
+
 USERNAME_M_LENGTH = 150
 
 EMAIL_M_LENGTH = 150
@@ -0,0 +1,24 @@
+"""
+Настройки gunicorn (файл подхватывается из рабочей папки автоматически).
+С API_WARMUP=True каждый воркер прогревается до приёма запросов,
+см. api.warmup. При preload_app прогрев без базы (warm_up(connect=False))
+можно выполнить и в мастере до fork.
+"""
+import os
+
+
+def post_worker_init(worker):
+    if os.getenv('API_WARMUP', default='True') != 'True':
+        return
+    from api.warmup import warm_up
+
+    try:
+        report = warm_up()
+    except Exception:
+        # Без прогрева воркер всё равно должен принимать запросы.
+        worker.log.exception('Прогрев воркера %s не удался', worker.pid)
+        return
+    worker.log.info(
+        'Воркер %s прогрет: первый запрос %.1f мс, после прогрева %.1f мс',
+        worker.pid, report['cold_request'], report['warm_request'],
+    )
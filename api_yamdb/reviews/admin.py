@@ -32,8 +32,11 @@ class TitleAdmin(admin.ModelAdmin):
         'description',
         'category',
         'year',
+        'rating',
+        'reviews_count',
     )
     list_editable = ('category', )
+    readonly_fields = ('score_sum', 'reviews_count', 'rating')
     search_fields = ('name', )
     filter_horizontal = ('genre', )
 
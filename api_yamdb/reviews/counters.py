@@ -0,0 +1,166 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Cast, NullIf
+
+from .models import Comments, Review, ScoreHistogram, Title
+
+
+def shift_title_score(title_id, score_delta, count_delta):
+    """
+    Сдвигает сумму оценок и количество отзывов произведения
+    и пересчитывает его рейтинг одним атомарным UPDATE.
+    """
+    Title.objects.filter(pk=title_id).update(
+        score_sum=F('score_sum') + score_delta,
+        reviews_count=F('reviews_count') + count_delta,
+        rating=(
+            Cast(F('score_sum') + score_delta, FloatField())
+            / NullIf(
+                Cast(F('reviews_count') + count_delta, FloatField()),
+                Value(0.0)
+            )
+        ),
+    )
+
+
+def shift_comments_count(review_id, delta):
+    """Сдвигает количество комментариев отзыва атомарным UPDATE."""
+    Review.objects.filter(pk=review_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def shift_histogram(title_id, removed=None, added=None):
+    """
+    Переносит одну оценку в распределении оценок произведения:
+    removed - убранная оценка, added - добавленная (None - нет такой).
+    Если строки распределения ещё нет, пересчитывает произведение.
+    """
+    if removed == added:
+        return
+    changes = {}
+    if removed is not None:
+        field = f'score_{removed}'
+        changes[field] = F(field) - 1
+    if added is not None:
+        field = f'score_{added}'
+        changes[field] = F(field) + 1
+    if not ScoreHistogram.objects.filter(title_id=title_id).update(
+            **changes):
+        recount_titles(title_ids=[title_id])
+
+
+def count_scores(title_ids):
+    """Распределения оценок произведений одним агрегирующим запросом:
+    словарь {id произведения: [количество оценок 1..10]}."""
+    histograms = defaultdict(lambda: [0] * 10)
+    for row in Review.objects.filter(title_id__in=title_ids).order_by(
+    ).values('title_id', 'score').annotate(number=Count('pk')):
+        histograms[row['title_id']][row['score'] - 1] = row['number']
+    return histograms
+
+
+def recount_batch(titles, check):
+    """Сверяет счётчики и распределения пачки произведений с отзывами
+    и, если check=False, исправляет их. Возвращает число расхождений."""
+    histograms = count_scores([title.pk for title in titles])
+    stored = ScoreHistogram.objects.in_bulk([title.pk for title in titles])
+    changed_titles, changed_histograms, new_histograms = [], [], []
+    mismatched = set()
+    for title in titles:
+        counts = histograms[title.pk]
+        reviews_count = sum(counts)
+        score_sum = sum(
+            score * number for score, number in enumerate(counts, 1))
+        rating = score_sum / reviews_count if reviews_count else None
+        if (title.score_sum, title.reviews_count, title.rating) != (
+                score_sum, reviews_count, rating):
+            title.score_sum = score_sum
+            title.reviews_count = reviews_count
+            title.rating = rating
+            changed_titles.append(title)
+            mismatched.add(title.pk)
+        histogram = stored.get(title.pk)
+        if histogram is None:
+            histogram = ScoreHistogram(title_id=title.pk)
+            new_histograms.append(histogram)
+        elif histogram.counts != counts:
+            changed_histograms.append(histogram)
+        else:
+            continue
+        for field, number in zip(ScoreHistogram.FIELDS, counts):
+            setattr(histogram, field, number)
+        mismatched.add(title.pk)
+    if not check:
+        # Небольшие пачки: UPDATE с CASE по id дорожает квадратично.
+        Title.objects.bulk_update(
+            changed_titles, ('score_sum', 'reviews_count', 'rating'),
+            batch_size=100
+        )
+        ScoreHistogram.objects.bulk_update(
+            changed_histograms, ScoreHistogram.FIELDS, batch_size=100
+        )
+        ScoreHistogram.objects.bulk_create(new_histograms)
+    return len(mismatched)
+
+
+def recount_titles(title_ids=None, batch_size=1000, check=False):
+    """
+    Пересчитывает счётчики и распределения оценок произведений
+    по таблице отзывов пачками по batch_size произведений,
+    по одному агрегирующему запросу на пачку.
+    При check=True только ищет расхождения, ничего не записывая.
+    Возвращает пару (проверено произведений, найдено расхождений).
+    """
+    queryset = Title.objects.order_by('pk').only(
+        'pk', 'score_sum', 'reviews_count', 'rating'
+    )
+    if title_ids is not None:
+        queryset = queryset.filter(pk__in=title_ids)
+    checked = mismatched = 0
+    last_pk = 0
+    while True:
+        titles = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not titles:
+            break
+        last_pk = titles[-1].pk
+        checked += len(titles)
+        mismatched += recount_batch(titles, check)
+    return checked, mismatched
+
+
+def recount_reviews(review_ids=None, batch_size=1000, check=False):
+    """
+    Пересчитывает количество комментариев отзывов по таблице
+    комментариев пачками по batch_size отзывов.
+    При check=True только ищет расхождения, ничего не записывая.
+    Возвращает пару (проверено отзывов, найдено расхождений).
+    """
+    queryset = Review.objects.order_by('pk').only('pk', 'comments_count')
+    if review_ids is not None:
+        queryset = queryset.filter(pk__in=review_ids)
+    checked = mismatched = 0
+    last_pk = 0
+    while True:
+        reviews = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not reviews:
+            break
+        last_pk = reviews[-1].pk
+        counts = dict(Comments.objects.filter(
+            review_id__in=[review.pk for review in reviews]
+        ).order_by().values('review_id').annotate(
+            number=Count('pk')
+        ).values_list('review_id', 'number'))
+        changed = []
+        for review in reviews:
+            comments_count = counts.get(review.pk, 0)
+            if review.comments_count != comments_count:
+                review.comments_count = comments_count
+                changed.append(review)
+        checked += len(reviews)
+        mismatched += len(changed)
+        if changed and not check:
+            Review.objects.bulk_update(changed, ('comments_count',),
+                                       batch_size=100)
+    return checked, mismatched
@@ -0,0 +1,174 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Min, Q, Value
+from django.db.models.functions import Cast
+
+from .models import Category, Genre, LeaderboardEntry, Title
+
+OVERALL = 'all'
+
+
+def genre_board(genre_id):
+    return f'genre:{genre_id}'
+
+
+def category_board(category_id):
+    return f'category:{category_id}'
+
+
+def weighted_score():
+    """
+    Байесовская оценка произведения: средняя оценка, к которой
+    добавлены LEADERBOARD_PRIOR_REVIEWS отзывов с оценкой
+    LEADERBOARD_PRIOR_MEAN. Произведение с парой десяток не обгоняет
+    произведение с сотней девяток.
+    """
+    prior = settings.LEADERBOARD_PRIOR_REVIEWS
+    return (
+        (Cast(F('score_sum'), FloatField())
+         + Value(prior * settings.LEADERBOARD_PRIOR_MEAN))
+        / (Cast(F('reviews_count'), FloatField()) + Value(float(prior)))
+    )
+
+
+def ranked_titles(board):
+    """Произведения рейтинга board с взвешенной оценкой, лучшие первыми."""
+    kind, _, key = board.partition(':')
+    condition = Q(reviews_count__gte=settings.LEADERBOARD_MIN_REVIEWS)
+    if kind == 'genre':
+        condition &= Q(genre=key)
+    elif kind == 'category':
+        condition &= Q(category_id=key)
+    return Title.objects.filter(condition).annotate(
+        weighted=weighted_score()
+    ).order_by('-weighted', 'pk')
+
+
+def fill_board(board):
+    """
+    Дополняет рейтинг до LEADERBOARD_SIZE лучшими произведениями,
+    которых в нём нет, и убирает вытесненные ими.
+    """
+    entries = LeaderboardEntry.objects.filter(board=board)
+    stored = list(entries.order_by('-score', 'title_id').values_list(
+        'score', 'title_id'))
+    size = settings.LEADERBOARD_SIZE
+    candidates = ranked_titles(board).exclude(
+        pk__in=[title_id for _, title_id in stored]
+    ).values_list('weighted', 'pk')[:size - len(stored) + 1]
+    if not candidates:
+        return
+    ranked = sorted(
+        [(score, title_id, False) for score, title_id in stored]
+        + [(score, title_id, True) for score, title_id in candidates],
+        key=lambda row: (-row[0], row[1]),
+    )
+    kept, dropped = ranked[:size], ranked[size:]
+    LeaderboardEntry.objects.bulk_create([
+        LeaderboardEntry(board=board, title_id=title_id, score=score)
+        for score, title_id, new in kept if new
+    ], ignore_conflicts=True)
+    entries.filter(title_id__in=[
+        title_id for _, title_id, new in dropped if not new
+    ]).delete()
+
+
+def trim_board(board):
+    """Оставляет в рейтинге LEADERBOARD_SIZE лучших произведений."""
+    entries = LeaderboardEntry.objects.filter(board=board)
+    extra = list(entries.order_by('-score', 'title_id').values_list(
+        'pk', flat=True)[settings.LEADERBOARD_SIZE:])
+    entries.filter(pk__in=extra).delete()
+
+
+def update_title(title_id):
+    """
+    Пересчитывает места произведения во всех его рейтингах (общем,
+    категории и жанров) после изменения отзывов, жанров или категории.
+    Места обновляются общими запросами для всех рейтингов сразу.
+    В заполненные рейтинги, где произведение ниже последнего места,
+    оно не вставляется: если его не было ни в одном рейтинге, всё
+    обходится тремя запросами на чтение.
+    """
+    row = Title.objects.filter(pk=title_id).annotate(
+        weighted=weighted_score()
+    ).values_list('weighted', 'reviews_count', 'category_id').first()
+    boards = set()
+    score = None
+    if row is not None and row[1] >= settings.LEADERBOARD_MIN_REVIEWS:
+        score, _, category_id = row
+        boards.add(OVERALL)
+        if category_id is not None:
+            boards.add(category_board(category_id))
+        boards.update(
+            genre_board(genre_id)
+            for genre_id in Title.genre.through.objects.filter(
+                title_id=title_id).values_list('genre_id', flat=True)
+        )
+    mine = Q(title_id=title_id)
+    stats = {
+        entry['board']: entry
+        for entry in LeaderboardEntry.objects.filter(
+            Q(board__in=boards) | mine
+        ).values('board').annotate(
+            count=Count('pk'), lowest=Min('score'),
+            stored=Count('pk', filter=mine), old=Min('score', filter=mine),
+        )
+    }
+    stored = {board for board, entry in stats.items() if entry['stored']}
+    size = settings.LEADERBOARD_SIZE
+    empty = {'count': 0, 'lowest': None, 'old': None}
+    added = {
+        board for board in boards - stored
+        if stats.get(board, empty)['count'] < size
+        or score >= stats[board]['lowest']
+    }
+    if stored - boards:
+        LeaderboardEntry.objects.filter(
+            mine, board__in=stored - boards).delete()
+    if stored & boards:
+        LeaderboardEntry.objects.filter(
+            mine, board__in=stored & boards).update(score=score)
+    # Параллельное обновление того же произведения могло успеть
+    # вставить строку - повтор не считается ошибкой.
+    LeaderboardEntry.objects.bulk_create([
+        LeaderboardEntry(board=board, title_id=title_id, score=score)
+        for board in added
+    ], ignore_conflicts=True)
+    for board in added:
+        if stats.get(board, empty)['count'] >= size:
+            trim_board(board)
+    for board in stored:
+        entry = stats[board]
+        if board not in boards or (
+                entry['count'] == size
+                and min(score, entry['old']) <= entry['lowest']):
+            # Произведение выбыло или могло стать последним - его место
+            # может занять произведение, которого в таблице нет.
+            # В неполном рейтинге хранятся все подходящие произведения.
+            fill_board(board)
+
+
+def schedule_update(title_id):
+    """Пересчитывает места произведения после фиксации транзакции:
+    запись отзыва не ждёт рейтингов и не откатывается из-за них."""
+    transaction.on_commit(partial(update_title, title_id))
+
+
+def rebuild_leaderboards():
+    """Собирает все рейтинги заново. Возвращает их количество."""
+    boards = [OVERALL]
+    boards += [category_board(pk)
+               for pk in Category.objects.values_list('pk', flat=True)]
+    boards += [genre_board(pk)
+               for pk in Genre.objects.values_list('pk', flat=True)]
+    LeaderboardEntry.objects.all().delete()
+    for board in boards:
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(board=board, title_id=title_id, score=score)
+            for score, title_id in ranked_titles(board).values_list(
+                'weighted', 'pk')[:settings.LEADERBOARD_SIZE]
+        ])
+    return len(boards)
@@ -0,0 +1,126 @@
+import csv
+import gzip
+import json
+import os
+
+from django.db import connection
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+# Таблицы в формате файлов load_data: имя файла, модель и пары
+# (заголовок столбца, атрибут модели).
+TABLES = (
+    ('users', User, (
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+        ('last_name', 'last_name'), ('password', 'password'),
+        ('is_staff', 'is_staff'), ('is_superuser', 'is_superuser'),
+        ('is_active', 'is_active'),
+    )),
+    ('genre', Genre, (('id', 'id'), ('name', 'name'), ('slug', 'slug'))),
+    ('category', Category, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    ('titles', Title, (
+        ('id', 'id'), ('name', 'name'), ('year', 'year'),
+        ('category', 'category_id'), ('description', 'description'),
+    )),
+    ('genre_title', Title.genre.through, (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    )),
+    ('review', Review, (
+        ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+        ('author', 'author_id'), ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    ('comments', Comments, (
+        ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+        ('author', 'author_id'), ('pub_date', 'pub_date'),
+    )),
+)
+
+
+def open_output(path, compress):
+    if compress:
+        return gzip.open(f'{path}.gz', 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def iter_rows(model, columns, chunk_size):
+    """Построчно читает таблицу курсором на стороне сервера
+    (на PostgreSQL), не загружая её в память целиком."""
+    return model.objects.order_by('pk').values_list(
+        *[attname for _, attname in columns]
+    ).iterator(chunk_size=chunk_size)
+
+
+def to_text(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def write_csv(file, model, columns, chunk_size):
+    writer = csv.writer(file)
+    writer.writerow([header for header, _ in columns])
+    written = 0
+    for row in iter_rows(model, columns, chunk_size):
+        writer.writerow([to_text(value) for value in row])
+        written += 1
+    return written
+
+
+def write_ndjson(file, model, columns, chunk_size):
+    headers = [header for header, _ in columns]
+    written = 0
+    for row in iter_rows(model, columns, chunk_size):
+        file.write(json.dumps(
+            dict(zip(headers, map(to_text, row))), ensure_ascii=False
+        ))
+        file.write('\n')
+        written += 1
+    return written
+
+
+def copy_column(model, header, attname):
+    """Столбец для COPY. Флаги выводятся как True/False, как их пишет
+    write_csv, а не t/f, как их выводит COPY."""
+    field = model._meta.get_field(attname)
+    column = connection.ops.quote_name(field.column)
+    if field.get_internal_type() == 'BooleanField':
+        column = f"CASE WHEN {column} THEN 'True' ELSE 'False' END"
+    return f'{column} AS {connection.ops.quote_name(header)}'
+
+
+def copy_csv(file, model, columns, chunk_size):
+    """Выгружает таблицу командой COPY ... TO STDOUT (только PostgreSQL)."""
+    select = ', '.join(
+        copy_column(model, header, attname) for header, attname in columns
+    )
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY (SELECT {select} FROM {table} ORDER BY 1) '
+            'TO STDOUT WITH CSV HEADER',
+            file,
+        )
+        return cursor.rowcount
+
+
+WRITERS = {
+    'csv': write_csv,
+    'ndjson': write_ndjson,
+    'copy': copy_csv,
+}
+
+
+def export_table(output_dir, table, data_format, compress, chunk_size):
+    """Выгружает таблицу в файл output_dir/<имя>.<формат>[.gz].
+    Возвращает пару (имя файла, количество строк)."""
+    name, model, columns = table
+    extension = 'ndjson' if data_format == 'ndjson' else 'csv'
+    path = os.path.join(output_dir, f'{name}.{extension}')
+    with open_output(path, compress) as file:
+        written = WRITERS[data_format](file, model, columns, chunk_size)
+    return name, written
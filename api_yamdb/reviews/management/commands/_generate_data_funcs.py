@@ -0,0 +1,210 @@
+from array import array
+from datetime import timedelta
+
+from django.db.models import Max
+from django.utils import timezone
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+TitleGenre = Title.genre.through
+
+GENRES = (
+    'Драма', 'Комедия', 'Фантастика', 'Детектив', 'Триллер', 'Ужасы',
+    'Приключения', 'Мелодрама', 'Документальный', 'Мультфильм', 'Рок',
+    'Джаз', 'Классика', 'Поэзия', 'Роман', 'Сказка',
+)
+CATEGORIES = (
+    ('Фильм', 'movie'), ('Книга', 'book'), ('Музыка', 'music'),
+    ('Сериал', 'series'), ('Игра', 'game'),
+)
+WORDS = (
+    'война', 'мир', 'звезда', 'ночь', 'город', 'море', 'время', 'тайна',
+    'король', 'дорога', 'сердце', 'тень', 'огонь', 'зима', 'лето', 'остров',
+    'песня', 'солнце', 'брат', 'сестра', 'дом', 'небо', 'река', 'лес',
+)
+# Оценки смещены к 7-9, как в реальных каталогах.
+SCORE_WEIGHTS = (1, 1, 2, 2, 4, 6, 10, 14, 10, 6)
+MODERATOR_SHARE = 0.01
+# Отзывы и комментарии распределяются по последним трём годам.
+PERIOD = timedelta(days=3 * 365).total_seconds()
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+def zipf_cum_weights(count, exponent):
+    """Накопленные веса закона Ципфа для рангов 1..count."""
+    total = 0.0
+    cum_weights = []
+    for rank in range(1, count + 1):
+        total += rank ** -exponent
+        cum_weights.append(total)
+    return cum_weights
+
+
+class DataGenerator:
+    """
+    Генерирует объекты моделей для bulk_create.
+    Популярность произведений и активность авторов подчиняются закону
+    Ципфа с показателем skew: несколько произведений собирают большую
+    часть отзывов, несколько авторов пишут большую часть текстов.
+    Средние значения reviews_per_title и comments_per_review сохраняются,
+    но число отзывов произведения не больше числа пользователей, а авторы
+    отзывов одного произведения различны (ограничение unique_review).
+    Идентификаторы продолжают уже существующие в базе.
+    """
+
+    def __init__(self, rnd, users, titles, reviews_per_title,
+                 comments_per_review, skew):
+        self.rnd = rnd
+        self.users = users
+        self.titles = titles
+        self.reviews_per_title = reviews_per_title
+        self.comments_per_review = comments_per_review
+        self.skew = skew
+        self.now = timezone.now()
+        first_user_id, first_title_id = next_id(User), next_id(Title)
+        self.user_ids = range(first_user_id, first_user_id + users)
+        self.title_ids = range(first_title_id, first_title_id + titles)
+        self.first_review_id = next_id(Review)
+        self.author_weights = zipf_cum_weights(users, skew)
+        # Смещение даты каждого отзыва от начала периода, в секундах:
+        # комментарии к отзыву пишутся не раньше него.
+        self.review_offsets = array('d')
+        self.genre_ids = list(Genre.objects.values_list('id', flat=True))
+        self.category_ids = list(
+            Category.objects.values_list('id', flat=True))
+
+    def make_genres(self):
+        if self.genre_ids:
+            return
+        start = next_id(Genre)
+        for number, name in enumerate(GENRES):
+            self.genre_ids.append(start + number)
+            yield Genre(id=start + number, name=name,
+                        slug=f'genre-{start + number}')
+
+    def make_categories(self):
+        if self.category_ids:
+            return
+        start = next_id(Category)
+        for number, (name, slug) in enumerate(CATEGORIES):
+            self.category_ids.append(start + number)
+            yield Category(id=start + number, name=name,
+                           slug=f'{slug}-{start + number}')
+
+    def make_users(self):
+        for user_id in self.user_ids:
+            moderator = self.rnd.random() < MODERATOR_SHARE
+            yield User(
+                id=user_id,
+                username=f'user{user_id}',
+                email=f'user{user_id}@yamdb.fake',
+                role=User.MODER if moderator else User.USER,
+            )
+
+    def make_titles(self):
+        category_weights = zipf_cum_weights(len(self.category_ids), 1)
+        year = self.now.year
+        for title_id in self.title_ids:
+            words = self.rnd.choices(WORDS, k=self.rnd.randint(1, 4))
+            yield Title(
+                id=title_id,
+                name=' '.join(words).capitalize(),
+                year=max(1900, year - int(self.rnd.expovariate(1 / 15))),
+                category_id=self.rnd.choices(
+                    self.category_ids, cum_weights=category_weights)[0],
+            )
+
+    def make_title_genres(self):
+        for title_id in self.title_ids:
+            count = min(self.rnd.randint(1, 3), len(self.genre_ids))
+            for genre_id in self.rnd.sample(self.genre_ids, count):
+                yield TitleGenre(title_id=title_id, genre_id=genre_id)
+
+    def review_counts(self):
+        """Число отзывов каждого произведения: по Ципфу от ранга
+        популярности, ранги перемешаны между произведениями."""
+        cum_weights = zipf_cum_weights(self.titles, self.skew)
+        if not cum_weights:
+            return []
+        scale = self.reviews_per_title * self.titles / cum_weights[-1]
+        counts = []
+        previous = 0.0
+        for weight in cum_weights:
+            expected = (weight - previous) * scale
+            previous = weight
+            count = int(expected)
+            if self.rnd.random() < expected - count:
+                count += 1
+            counts.append(min(count, self.users))
+        self.rnd.shuffle(counts)
+        return counts
+
+    def sample_authors(self, count):
+        """Различные авторы с учётом их активности."""
+        if count * 2 >= self.users:
+            return self.rnd.sample(self.user_ids, count)
+        authors = set()
+        for _ in range(5):
+            authors.update(self.rnd.choices(
+                self.user_ids, cum_weights=self.author_weights,
+                k=count - len(authors),
+            ))
+            if len(authors) == count:
+                return authors
+        while len(authors) < count:
+            authors.add(self.rnd.choice(self.user_ids))
+        return authors
+
+    def date(self, offset):
+        return self.now - timedelta(seconds=PERIOD - offset)
+
+    def make_reviews(self):
+        review_id = self.first_review_id
+        for title_id, count in zip(self.title_ids, self.review_counts()):
+            for author_id in self.sample_authors(count):
+                offset = self.rnd.random() * PERIOD
+                self.review_offsets.append(offset)
+                yield Review(
+                    id=review_id,
+                    title_id=title_id,
+                    author_id=author_id,
+                    text='Текст отзыва',
+                    score=self.rnd.choices(range(1, 11),
+                                           weights=SCORE_WEIGHTS)[0],
+                    pub_date=self.date(offset),
+                )
+                review_id += 1
+
+    def make_comments(self):
+        if not self.comments_per_review:
+            return
+        rate = 1 / self.comments_per_review
+        for number, offset in enumerate(self.review_offsets):
+            count = int(self.rnd.expovariate(rate) + 0.5)
+            if not count:
+                continue
+            authors = self.rnd.choices(self.user_ids,
+                                       cum_weights=self.author_weights,
+                                       k=count)
+            for author_id in authors:
+                yield Comments(
+                    review_id=self.first_review_id + number,
+                    author_id=author_id,
+                    text='Текст комментария',
+                    pub_date=self.date(
+                        offset + self.rnd.random() * (PERIOD - offset)),
+                )
+
+    def tables(self):
+        """Пары (имя, модель, итератор объектов) в порядке вставки."""
+        return (
+            ('genre', Genre, self.make_genres()),
+            ('category', Category, self.make_categories()),
+            ('users', User, self.make_users()),
+            ('titles', Title, self.make_titles()),
+            ('genre_title', TitleGenre, self.make_title_genres()),
+            ('review', Review, self.make_reviews()),
+            ('comments', Comments, self.make_comments()),
+        )
@@ -1,127 +1,181 @@
+import gzip
+import json
+import os
+import time
+from contextlib import contextmanager
 from csv import DictReader
 
+from django.core.management.color import no_style
+from django.db import connection
 from reviews.models import Category, Comments, Genre, Review, Title, User
 
-
-def load_users():
-    """Загружает данные из файла users.csv."""
-    print('loading user data...')
-    with open('static/data/users.csv', encoding='utf-8') as file:
-        reader = DictReader(file)
-        users = []
-        for row in reader:
-            user = User(
-                role=row['role'],
-                username=row['username'],
-                id=row['id'],
-                email=row['email'],
-            )
-            users.append(user)
-        User.objects.bulk_create(users)
-    print('user data loaded!')
-
-
-def load_genres():
-    """Загружает данные из файла genre.csv."""
-    print('loading genre data...')
-    with open('static/data/genre.csv', encoding='utf-8') as file:
-        reader = DictReader(file)
-        genres = []
-        for row in reader:
-            genre = Genre(
-                slug=row['slug'],
-                name=row['name'],
-                id=row['id'],
-            )
-            genres.append(genre)
-        Genre.objects.bulk_create(genres)
-    print('genre data loaded!')
-
-
-def load_categories():
-    """Загружает данные из файла category.csv."""
-    print('loading category data...')
-    with open('static/data/category.csv', encoding='utf-8') as file:
-        reader = DictReader(file)
-        categories = []
-        for row in reader:
-            category = Category(
-                slug=row['slug'],
-                name=row['name'],
-                id=row['id'],
-            )
-            categories.append(category)
-        Category.objects.bulk_create(categories)
-    print('category data loaded!')
-
-
-def load_title():
-    """Загружает данные из файла titles.csv."""
-    print('loading title data...')
-    with open('static/data/titles.csv', encoding='utf-8') as file:
-        reader = DictReader(file)
-        titles = []
-        for row in reader:
-            category = Category.objects.get(id=row['category'])
-            title = Title(
-                year=row['year'],
-                name=row['name'],
-                id=row['id'],
-                category=category
-            )
-            titles.append(title)
-        Title.objects.bulk_create(titles)
-    print('title data loaded!')
-
-
-def load_genre_title():
-    """Загружает данные из файла genre_title.csv."""
-    print('loading genre/title relation data...')
-    with open('static/data/genre_title.csv', encoding='utf-8') as file:
-        reader = DictReader(file)
-
-        for row in reader:
-            genre = Genre.objects.get(id=row['genre_id'])
-            title = Title.objects.get(id=row['title_id'])
-            title.genre.add(genre)
-            title.save()
-    print('genre/title relation data loaded!')
-
-
-def load_reviews():
-    """Загружает данные из файла review.csv."""
-    print('loading reviews data...')
-    with open('static/data/review.csv', encoding='utf-8') as file:
-        reader = DictReader(file)
-        reviews = []
-        for row in reader:
-            review = Review(
-                title=Title.objects.get(id=row['title_id']),
-                id=row['id'],
-                text=row['text'],
-                author=User.objects.get(id=row['author']),
-                score=row['score'],
-                pub_date=row['pub_date']
-            )
-            reviews.append(review)
-        Review.objects.bulk_create(reviews)
-    print('reviews data loaded!')
-
-
-def load_comments():
-    """Загружает данные из файла comments.csv."""
-    print('loading comment data...')
-    with open('static/data/comments.csv', encoding='utf-8') as file:
-        reader = DictReader(file)
-        comments = []
-        for row in reader:
-            comment = Comments(
-                review=Review.objects.get(id=row['review_id']),
-                id=row['id'],
-                text=row['text'],
-                author=User.objects.get(id=row['author']),
-                pub_date=row['pub_date']
-            )
-            comments.append(comment)
-        Comments.objects.bulk_create(comments)
-    print('comment data loaded!')
+TitleGenre = Title.genre.through
+
+
+def to_bool(value, default=False):
+    """Флаг из csv ("True"/"False", как его пишет export_data,
+    или t/f из COPY PostgreSQL) или ndjson (true/false);
+    пустое значение - default."""
+    if value in (None, ''):
+        return default
+    return value in (True, 'True', 'true', 't', '1')
+
+
+def build_user(row):
+    return User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row.get('role') or User.USER,
+        bio=row.get('bio') or None,
+        first_name=row.get('first_name') or '',
+        last_name=row.get('last_name') or '',
+        password=row.get('password') or '',
+        is_staff=to_bool(row.get('is_staff')),
+        is_superuser=to_bool(row.get('is_superuser')),
+        is_active=to_bool(row.get('is_active'), default=True),
+    )
+
+
+def build_genre(row):
+    return Genre(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def build_category(row):
+    return Category(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def build_title(row):
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'],
+        description=row.get('description') or None,
+        category_id=row.get('category') or None,
+    )
+
+
+def build_genre_title(row):
+    return TitleGenre(
+        id=row.get('id') or None,
+        title_id=row['title_id'],
+        genre_id=row['genre_id'],
+    )
+
+
+def build_review(row):
+    return Review(
+        id=row['id'],
+        title_id=row['title_id'],
+        author_id=row['author'],
+        text=row['text'],
+        score=row['score'],
+        pub_date=row['pub_date'],
+    )
+
+
+def build_comment(row):
+    return Comments(
+        id=row['id'],
+        review_id=row['review_id'],
+        author_id=row['author'],
+        text=row['text'],
+        pub_date=row['pub_date'],
+    )
+
+
+# Файлы без внешних ключей, их можно загружать параллельно.
+INDEPENDENT_TABLES = (
+    ('users', User, build_user),
+    ('genre', Genre, build_genre),
+    ('category', Category, build_category),
+)
+# Файлы со ссылками на предыдущие, загружаются строго по порядку.
+DEPENDENT_TABLES = (
+    ('titles', Title, build_title),
+    ('genre_title', TitleGenre, build_genre_title),
+    ('review', Review, build_review),
+    ('comments', Comments, build_comment),
+)
+
+
+FILE_FORMATS = ('csv', 'csv.gz', 'ndjson', 'ndjson.gz')
+
+
+def read_rows(data_dir, name):
+    """
+    Построчно читает файл name из data_dir в первом найденном формате:
+    csv или ndjson, возможно сжатый gzip (как их пишет export_data).
+    """
+    for extension in FILE_FORMATS:
+        path = os.path.join(data_dir, f'{name}.{extension}')
+        if os.path.exists(path):
+            break
+    else:
+        raise FileNotFoundError(f'Не найден файл {name} в {data_dir}')
+    opener = gzip.open if extension.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as file:
+        if extension.startswith('ndjson'):
+            yield from (json.loads(line) for line in file if line.strip())
+        else:
+            yield from DictReader(file)
+
+
+@contextmanager
+def keep_pub_date():
+    """Отключает auto_now_add у pub_date, чтобы bulk_create сохранял
+    даты публикации из файлов, а не текущее время."""
+    fields = [model._meta.get_field('pub_date') for model in (Review,
+                                                              Comments)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def load_table(data_dir, name, model, build, batch_size, report):
+    """
+    Загружает файл name.csv в модель model пачками по batch_size строк.
+    Внешние ключи присваиваются напрямую через *_id без запросов к базе.
+    Возвращает количество загруженных строк.
+    """
+    return insert_batches(
+        name, model, (build(row) for row in read_rows(data_dir, name)),
+        batch_size, report,
+    )
+
+
+def insert_batches(name, model, objects, batch_size, report):
+    """
+    Вставляет объекты из итератора objects пачками по batch_size
+    через bulk_create, не держа в памяти больше одной пачки.
+    После каждой пачки вызывает report(name, вставлено строк, секунд).
+    Возвращает количество вставленных строк.
+    """
+    start = time.perf_counter()
+    loaded = 0
+    batch = []
+    for instance in objects:
+        batch.append(instance)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            loaded += len(batch)
+            batch = []
+            report(name, loaded, time.perf_counter() - start)
+    if batch:
+        model.objects.bulk_create(batch)
+        loaded += len(batch)
+    report(name, loaded, time.perf_counter() - start)
+    return loaded
+
+
+def reset_sequences():
+    """Сдвигает последовательности первичных ключей за загруженные id
+    (на PostgreSQL без этого следующие INSERT получат занятые id)."""
+    models = [model for _, model, _ in INDEPENDENT_TABLES + DEPENDENT_TABLES]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from ._export_data_funcs import TABLES, export_table
+
+
+class Command(BaseCommand):
+    """Создает комманду для django, выгружающую все данные проекта
+    в csv или ndjson файлы, совместимые с load_data.
+    Для запуска - python manage.py export_data <папка>.
+    Таблицы читаются потоково (iterator с курсором на стороне сервера
+    на PostgreSQL), поэтому память не растёт с размером базы.
+    На PostgreSQL формат copy выгружает csv командой COPY.
+    С --jobs таблицы выгружаются параллельно; согласованного снимка
+    между таблицами при этом нет, выгрузку стоит делать без записи в базу.
+    Собственно рабочий код находится в файле _export_data_funcs.py.
+    """
+
+    help = 'Выгружает данные моделей в файлы формата load_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help='Папка для файлов')
+        parser.add_argument(
+            '--format', choices=('csv', 'ndjson', 'copy'), default='csv',
+            help='Формат файлов (copy - csv через COPY на PostgreSQL)',
+        )
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать файлы gzip',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Количество строк, читаемых из курсора за раз',
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=1,
+            help='Количество таблиц, выгружаемых параллельно',
+        )
+
+    def handle(self, *args, **options):
+        if (options['format'] == 'copy'
+                and connection.vendor != 'postgresql'):
+            raise CommandError('Формат copy доступен только на PostgreSQL')
+        os.makedirs(options['output_dir'], exist_ok=True)
+        export = partial(
+            self.export_in_thread if options['jobs'] > 1 else export_table,
+            options['output_dir'],
+            data_format=options['format'],
+            compress=options['gzip'],
+            chunk_size=options['chunk_size'],
+        )
+        try:
+            if options['jobs'] > 1:
+                with ThreadPoolExecutor(options['jobs']) as pool:
+                    results = list(pool.map(export, TABLES))
+            else:
+                results = [export(table) for table in TABLES]
+        except (OSError, DatabaseError) as error:
+            raise CommandError(f'Ошибка выгрузки данных: {error!r}')
+        for name, written in results:
+            self.stdout.write(f'{name}: {written} строк')
+
+    @staticmethod
+    def export_in_thread(*args, **kwargs):
+        try:
+            return export_table(*args, **kwargs)
+        finally:
+            connection.close()
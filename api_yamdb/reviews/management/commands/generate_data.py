@@ -0,0 +1,85 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from reviews.counters import recount_reviews, recount_titles
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.signals import bulk_loaded
+
+from ._generate_data_funcs import DataGenerator
+from ._load_data_funcs import insert_batches, keep_pub_date, reset_sequences
+
+
+class Command(BaseCommand):
+    """Создает комманду для django, заполняющую базу синтетическими
+    данными заданного объёма для воспроизведения нагрузки.
+    Для запуска - python manage.py generate_data --users 10000
+    --titles 10000 --reviews-per-title 100 --comments-per-review 3.
+    Данные добавляются к существующим; при одинаковом --seed
+    на пустой базе получается один и тот же набор.
+    Объекты создаются потоково и вставляются пачками через bulk_create
+    в одной транзакции, после неё отправляется сигнал bulk_loaded
+    (сброс кеша ответов). Собственно рабочий код находится в файле
+    _generate_data_funcs.py.
+    """
+
+    help = 'Заполняет базу синтетическими данными'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument(
+            '--reviews-per-title', type=int, default=10,
+            help='Среднее количество отзывов на произведение',
+        )
+        parser.add_argument(
+            '--comments-per-review', type=int, default=2,
+            help='Среднее количество комментариев к отзыву',
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help='Показатель закона Ципфа для популярности произведений '
+                 'и активности авторов (0 - равномерно)',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одном INSERT',
+        )
+
+    def report(self, name, loaded, seconds):
+        if self.verbosity < 1:
+            return
+        speed = loaded / seconds if seconds else 0
+        self.stdout.write(f'{name}: {loaded} строк, {speed:.0f} строк/с')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь')
+        self.verbosity = options['verbosity']
+        try:
+            with transaction.atomic(), keep_pub_date():
+                generator = DataGenerator(
+                    random.Random(options['seed']),
+                    users=options['users'],
+                    titles=options['titles'],
+                    reviews_per_title=options['reviews_per_title'],
+                    comments_per_review=options['comments_per_review'],
+                    skew=options['skew'],
+                )
+                total = sum(
+                    insert_batches(name, model, objects,
+                                   options['batch_size'], self.report)
+                    for name, model, objects in generator.tables()
+                )
+                reset_sequences()
+                recount_titles()
+                recount_reviews()
+                rebuild_leaderboards()
+            bulk_loaded.send(sender=self.__class__)
+        except DatabaseError as error:
+            raise CommandError(f'Ошибка генерации данных: {error!r}')
+        if self.verbosity:
+            self.stdout.write(self.style.SUCCESS(
+                f'Создано строк: {total}'
+            ))
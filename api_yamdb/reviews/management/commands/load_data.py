@@ -1,30 +1,113 @@
-from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
 
-from ._load_data_funcs import (load_categories, load_comments,
-                               load_genre_title, load_genres, load_reviews,
-                               load_title, load_users)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from reviews.counters import recount_reviews, recount_titles
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.signals import bulk_loaded
+
+from ._load_data_funcs import (DEPENDENT_TABLES, INDEPENDENT_TABLES,
+                               keep_pub_date, load_table, reset_sequences)
 
 
 class Command(BaseCommand):
     """Создает комманду для django,
     предназначенную для выгрузки данных из csv файлов
-    в папке /static/data/.
-    Для запуска - python manage.py load_data.
+    в папке /static/data/ (или в указанной папке).
+    Для запуска - python manage.py load_data [папка].
+    Строки читаются потоково и вставляются пачками через bulk_create
+    в одной транзакции, внешние ключи присваиваются по id без запросов.
+    С флагом --parallel независимые файлы (пользователи, жанры, категории)
+    загружаются параллельно, каждый в своей транзакции; если загрузка
+    потом прерывается, уже сохранённые из этих файлов строки удаляются.
+    После загрузки отправляется сигнал bulk_loaded (сброс кеша ответов).
     Собственно рабочий код находится в файле _load_data_funcs.py.
-    В планах оптимизировать работу функций, т.к. много повторяющегося кода.
     """
 
-    help = ('Загружает данные из csv файлов в',
-            '"/static/data/" в соответствующие модели')
+    help = ('Загружает данные из csv файлов в "/static/data/" '
+            'в соответствующие модели')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'data_dir', nargs='?', default='static/data',
+            help='Папка с csv файлами',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одном INSERT',
+        )
+        parser.add_argument(
+            '--parallel', action='store_true',
+            help='Загружать независимые файлы параллельно',
+        )
+
+    def report(self, name, loaded, seconds):
+        if self.verbosity < 1:
+            return
+        speed = loaded / seconds if seconds else 0
+        self.stdout.write(f'{name}: {loaded} строк, {speed:.0f} строк/с')
+
+    def load(self, tables):
+        with transaction.atomic(), keep_pub_date():
+            total = sum(
+                load_table(self.data_dir, name, model, build,
+                           self.batch_size, self.report)
+                for name, model, build in tables
+            )
+        return total
+
+    def load_in_thread(self, table):
+        name, model, build = table
+        ids = []
+
+        def build_and_track(row):
+            instance = build(row)
+            ids.append(instance.id)
+            return instance
+
+        try:
+            loaded = self.load([(name, model, build_and_track)])
+            self.committed[model] = ids
+            return loaded
+        finally:
+            connection.close()
+
+    def discard_committed(self):
+        """Удаляет строки, сохранённые параллельной загрузкой,
+        когда остальная загрузка не удалась."""
+        with transaction.atomic():
+            for model, ids in self.committed.items():
+                for start in range(0, len(ids), self.batch_size):
+                    model.objects.filter(
+                        pk__in=ids[start:start + self.batch_size]
+                    ).delete()
+        self.committed = {}
 
     def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.data_dir = options['data_dir']
+        self.batch_size = options['batch_size']
+        self.committed = {}
         try:
-            load_users()
-            load_genres()
-            load_categories()
-            load_title()
-            load_genre_title()
-            load_reviews()
-            load_comments()
-        except Exception as error:
-            print(error)
+            if options['parallel']:
+                with ThreadPoolExecutor(len(INDEPENDENT_TABLES)) as pool:
+                    total = sum(pool.map(self.load_in_thread,
+                                         INDEPENDENT_TABLES))
+                tables = DEPENDENT_TABLES
+            else:
+                total = 0
+                tables = INDEPENDENT_TABLES + DEPENDENT_TABLES
+            with transaction.atomic():
+                total += self.load(tables)
+                reset_sequences()
+                recount_titles()
+                recount_reviews()
+                rebuild_leaderboards()
+            bulk_loaded.send(sender=self.__class__)
+        except (OSError, KeyError, ValueError, DatabaseError) as error:
+            self.discard_committed()
+            raise CommandError(f'Ошибка загрузки данных: {error!r}')
+        if self.verbosity:
+            self.stdout.write(self.style.SUCCESS(
+                f'Загружено строк: {total}'
+            ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.counters import recount_reviews, recount_titles
+
+
+class Command(BaseCommand):
+    """Пересобирает денормализованные счётчики оценок произведений
+    (сумма оценок, количество отзывов, рейтинг, распределение оценок)
+    по таблице отзывов и счётчики комментариев отзывов.
+    Для запуска - python manage.py rebuild_counters.
+    С флагом --check только проверяет счётчики и сообщает о расхождениях.
+    """
+
+    help = 'Пересчитывает и проверяет счётчики рейтинга произведений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество произведений (отзывов), обрабатываемых '
+                 'за один запрос',
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить счётчики, ничего не изменяя',
+        )
+
+    def handle(self, *args, **options):
+        checked, mismatched = recount_titles(
+            batch_size=options['batch_size'], check=options['check']
+        )
+        reviews_checked, reviews_mismatched = recount_reviews(
+            batch_size=options['batch_size'], check=options['check']
+        )
+        mismatched += reviews_mismatched
+        summary = (f'Проверено произведений: {checked}, '
+                   f'отзывов: {reviews_checked}')
+        if options['check']:
+            message = f'{summary}, расхождений: {mismatched}'
+            if mismatched:
+                raise CommandError(message)
+            self.stdout.write(self.style.SUCCESS(message))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'{summary}, исправлено: {mismatched}'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    """Собирает рейтинги лучших произведений заново по счётчикам
+    произведений. Нужна после изменения настроек LEADERBOARD_*
+    или загрузки данных в обход моделей.
+    Для запуска - python manage.py rebuild_leaderboards.
+    """
+
+    help = 'Пересобирает рейтинги лучших произведений'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            boards = rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(
+            f'Собрано рейтингов: {boards}'
+        ))
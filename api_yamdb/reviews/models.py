@@ -121,6 +121,24 @@ class Title(models.Model):
         related_name='titles',
         null=True
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        db_index=True,
+        editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение'
@@ -131,6 +149,45 @@ class Title(models.Model):
         return self.name
 
 
+class ScoreHistogram(models.Model):
+    """
+    Количество оценок от 1 до 10 у произведения.
+    Обновляется сигналами отзывов (см. reviews.signals) в той же
+    транзакции, что и отзыв.
+    """
+    title = models.OneToOneField(
+        Title,
+        verbose_name='Произведение',
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='score_histogram',
+    )
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+
+    FIELDS = tuple(f'score_{score}' for score in range(1, 11))
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    @property
+    def counts(self):
+        """Список количеств оценок 1..10."""
+        return [getattr(self, field) for field in self.FIELDS]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.counts}'
+
+
 class ReviewComment(models.Model):
     """Родительская модель отзывов и комментариев."""
     pub_date = models.DateTimeField(
@@ -152,6 +209,15 @@ class ReviewComment(models.Model):
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные из базы значения, чтобы при сохранении
+        можно было сдвинуть счётчики родительского объекта на разницу
+        (см. reviews.signals)."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class Review(ReviewComment):
     """Модель отзывов к произведениям."""
@@ -167,6 +233,11 @@ class Review(ReviewComment):
             MaxValueValidator(10, message='Оценка не может быть больше 10!')
         ],
     )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta(ReviewComment.Meta):
         verbose_name = 'Отзыв'
@@ -177,6 +248,12 @@ class Review(ReviewComment):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=['title', 'comments_count'],
+                         name='review_title_comments_idx'),
+        ]
         default_related_name = 'reviews'
 
 
@@ -191,4 +268,42 @@ class Comments(ReviewComment):
     class Meta(ReviewComment.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+        ]
         default_related_name = 'comments'
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Строка материализованного рейтинга лучших произведений.
+    board - общий рейтинг ('all'), рейтинг жанра ('genre:<id>')
+    или категории ('category:<id>'). В каждом хранится не больше
+    LEADERBOARD_SIZE лучших произведений (см. reviews.leaderboards).
+    """
+    board = models.CharField('Рейтинг', max_length=50)
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+    )
+    score = models.FloatField('Взвешенная оценка')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтинге'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['board', 'title'],
+                name='unique_leaderboard_title'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['board', '-score', 'title'],
+                         name='leaderboard_board_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.board}: {self.title_id}'
@@ -0,0 +1,151 @@
+import threading
+
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+
+from . import leaderboards
+from .counters import (recount_titles, shift_comments_count,
+                       shift_histogram, shift_title_score)
+from .models import (Category, Comments, Genre, LeaderboardEntry, Review,
+                     ScoreHistogram, Title)
+
+# Отправляется командами load_data и generate_data после их транзакции:
+# строки вставлены через bulk_create, сигналы моделей не отправлялись.
+bulk_loaded = Signal()
+
+# Произведения и отзывы, которые сейчас удаляются в этом потоке
+# вместе с отзывами и комментариями (см. deleting).
+_deleting = threading.local()
+
+
+def deleting(kind):
+    """Множество pk удаляемых сейчас в этом потоке объектов kind
+    ('titles' или 'reviews')."""
+    pks = getattr(_deleting, kind, None)
+    if pks is None:
+        pks = set()
+        setattr(_deleting, kind, pks)
+    return pks
+
+
+@receiver(request_started)
+@receiver(request_finished)
+def forget_deleting(**kwargs):
+    """Удаление, упавшее после pre_delete, не присылает post_delete:
+    отметки сбрасываются на границах запроса, чтобы не отключить
+    счётчики объекта навсегда."""
+    _deleting.__dict__.clear()
+
+
+@receiver(post_save, sender=Review)
+def update_title_on_review_save(sender, instance, created, raw, **kwargs):
+    """Обновляет счётчики произведения после создания или правки отзыва."""
+    if raw:
+        return
+    previous = getattr(instance, '_loaded_values', {})
+    score = int(instance.score)
+    if created:
+        shift_title_score(instance.title_id, score, 1)
+        shift_histogram(instance.title_id, added=score)
+    elif 'title_id' not in previous or 'score' not in previous:
+        recount_titles(title_ids=[instance.title_id])
+    elif previous['title_id'] != instance.title_id:
+        shift_title_score(previous['title_id'], -previous['score'], -1)
+        shift_histogram(previous['title_id'], removed=previous['score'])
+        shift_title_score(instance.title_id, score, 1)
+        shift_histogram(instance.title_id, added=score)
+        leaderboards.schedule_update(previous['title_id'])
+    elif previous['score'] != score:
+        shift_title_score(instance.title_id, score - previous['score'], 0)
+        shift_histogram(instance.title_id, previous['score'], score)
+    current = {'title_id': instance.title_id, 'score': score}
+    if previous != current:
+        leaderboards.schedule_update(instance.title_id)
+    instance._loaded_values = current
+
+
+@receiver(pre_delete, sender=Review)
+def remember_deleting_review(sender, instance, **kwargs):
+    """Пока удаляются комментарии отзыва, его счётчик не сдвигается."""
+    deleting('reviews').add(instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def update_title_on_review_delete(sender, instance, **kwargs):
+    """Обновляет счётчики произведения после удаления отзыва."""
+    deleting('reviews').discard(instance.pk)
+    shift_title_score(instance.title_id, -int(instance.score), -1)
+    if instance.title_id not in deleting('titles'):
+        shift_histogram(instance.title_id, removed=int(instance.score))
+        leaderboards.schedule_update(instance.title_id)
+
+
+@receiver(post_save, sender=Comments)
+def update_review_on_comment_save(sender, instance, created, raw, **kwargs):
+    """Обновляет счётчик комментариев отзыва после создания комментария
+    или его переноса к другому отзыву."""
+    if raw:
+        return
+    previous = getattr(instance, '_loaded_values', {})
+    if created:
+        shift_comments_count(instance.review_id, 1)
+    elif previous.get('review_id', instance.review_id) != instance.review_id:
+        shift_comments_count(previous['review_id'], -1)
+        shift_comments_count(instance.review_id, 1)
+    instance._loaded_values = {'review_id': instance.review_id}
+
+
+@receiver(post_delete, sender=Comments)
+def update_review_on_comment_delete(sender, instance, **kwargs):
+    if instance.review_id not in deleting('reviews'):
+        shift_comments_count(instance.review_id, -1)
+
+
+@receiver(post_save, sender=Title)
+def create_histogram_on_title_save(sender, instance, created, raw,
+                                   **kwargs):
+    """Заводит распределение оценок нового произведения."""
+    if created and not raw:
+        ScoreHistogram.objects.create(title_id=instance.pk)
+
+
+@receiver(post_save, sender=Title)
+def update_leaderboards_on_title_save(sender, instance, created, raw,
+                                      **kwargs):
+    """У произведения могла смениться категория."""
+    if not created and not raw:
+        leaderboards.schedule_update(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_leaderboards_on_genres(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        leaderboards.schedule_update(instance.pk)
+
+
+@receiver(pre_delete, sender=Title)
+def remember_title_boards(sender, instance, **kwargs):
+    """Запоминает рейтинги удаляемого произведения. Пока удаляются
+    его отзывы, места в рейтингах для него не пересчитываются."""
+    deleting('titles').add(instance.pk)
+    instance._leaderboards = list(LeaderboardEntry.objects.filter(
+        title=instance
+    ).values_list('board', flat=True))
+
+
+@receiver(post_delete, sender=Title)
+def fill_leaderboards_on_title_delete(sender, instance, **kwargs):
+    """Место удалённого произведения занимает следующее."""
+    deleting('titles').discard(instance.pk)
+    for board in getattr(instance, '_leaderboards', ()):
+        leaderboards.fill_board(board)
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def drop_leaderboard(sender, instance, **kwargs):
+    board = (leaderboards.genre_board(instance.pk) if sender is Genre
+             else leaderboards.category_board(instance.pk))
+    LeaderboardEntry.objects.filter(board=board).delete()
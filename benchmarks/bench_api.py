@@ -0,0 +1,207 @@
+"""
+Измеряет время ответа и число SQL-запросов для всех маршрутов router_v1
+(списки, объекты, фильтры, сортировки, вложенные отзывы и комментарии)
+на синтетических данных (manage.py generate_data) и сравнивает результат
+с сохранённым эталоном.
+
+    python -m benchmarks.bench_api --titles 10000 --reviews-per-title 100 \\
+        --comments-per-review 3 --output results.json
+
+Числа запросов не зависят от машины и сравниваются всегда, время -
+с допуском --tolerance и только с эталоном, снятым на этой же машине
+при том же масштабе данных. При регрессии или маршруте, которого нет
+в эталоне, команда завершается с кодом 1. Новый эталон записывается
+флагом --save-baseline.
+"""
+import argparse
+import json
+import platform
+import sys
+from os.path import join
+
+from benchmarks.common import ROOT_DIR, measure, setup_database
+
+BASELINE = join(ROOT_DIR, 'benchmarks', 'baseline_api.json')
+# Разница меньше этой считается шумом.
+MIN_DELTA_MS = 2
+
+# Дополнительные варианты запросов к спискам: имя и параметры.
+VARIANTS = {
+    'users': (('search', {'search': 'user1'}),),
+    'titles': (
+        ('filtered', {'genre': 'genre-1,genre-2', 'year_min': 1990}),
+        ('ordered', {'ordering': '-rating'}),
+        ('search', {'search': 'мир'}),
+        ('sparse', {'fields': 'id,name,rating'}),
+    ),
+    'reviews': (
+        ('offset', {'offset': 50}),
+        ('cursor', {'pagination': 'cursor'}),
+    ),
+    'comments': (('cursor', {'pagination': 'cursor'}),),
+    'categories': (('search', {'search': 'Фильм'}),),
+    'genres': (('search', {'search': 'Драма'}),),
+}
+
+
+def populate(options):
+    from django.core.management import call_command
+
+    call_command(
+        'generate_data', users=options.users, titles=options.titles,
+        reviews_per_title=options.reviews_per_title,
+        comments_per_review=options.comments_per_review,
+        seed=options.seed, verbosity=0,
+    )
+
+
+def get_cases():
+    """Возвращает список (имя, url, параметры) для всех маршрутов
+    router_v1, доступных на чтение."""
+    from api.urls import router_v1
+    from reviews.models import Comments, User
+
+    # Самое популярное произведение и отзыв к нему с комментариями.
+    comment = Comments.objects.select_related('review').order_by(
+        '-review__title__reviews_count', 'id').first()
+    review = comment.review
+    kwargs = {'title_id': review.title_id, 'review_id': review.id}
+    lookups = {
+        'users': User.objects.order_by('id').first().username,
+        'titles': review.title_id,
+        'reviews': review.id,
+        'comments': comment.id,
+    }
+    cases = []
+    for prefix, viewset, basename in router_v1.registry:
+        prefix = prefix.replace(
+            r'(?P<title_id>\d+)', str(kwargs['title_id'])
+        ).replace(r'(?P<review_id>\d+)', str(kwargs['review_id']))
+        url = f'/api/v1/{prefix}/'
+        cases.append((f'{basename}-list', url, {}))
+        for name, params in VARIANTS.get(basename, ()):
+            cases.append((f'{basename}-list-{name}', url, params))
+        if hasattr(viewset, 'retrieve'):
+            cases.append((f'{basename}-detail',
+                          f'{url}{lookups[basename]}/', {}))
+    return cases
+
+
+def run_case(client, url, params, repeat):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def request():
+        # Кеш ответов сбрасывается, чтобы измерять работу с базой.
+        cache.clear()
+        return client.get(url, params)
+
+    with CaptureQueriesContext(connection) as context:
+        response = request()
+    return {
+        'url': url,
+        'params': params,
+        'status': response.status_code,
+        'queries': len(context.captured_queries),
+        'ms': round(measure(request, repeat) * 1000, 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Возвращает список регрессий относительно эталона."""
+    regressions = []
+    if (baseline['scale'] != results['scale']
+            or baseline.get('machine') != results['machine']):
+        print('Эталон снят на другой машине или при другом масштабе, '
+              'время не сравнивается.', file=sys.stderr)
+        tolerance = None
+    for name, result in results['cases'].items():
+        expected = baseline['cases'].get(name)
+        if expected is None:
+            regressions.append(f'{name}: нет в эталоне, обновите его '
+                               '(--save-baseline)')
+            continue
+        if result['status'] != expected['status']:
+            regressions.append(
+                f'{name}: статус {expected["status"]} -> {result["status"]}')
+        if result['queries'] > expected['queries']:
+            regressions.append(f'{name}: запросов {expected["queries"]} -> '
+                               f'{result["queries"]}')
+        if (tolerance is not None
+                and result['ms'] > expected['ms'] * (1 + tolerance)
+                and result['ms'] - expected['ms'] > MIN_DELTA_MS):
+            regressions.append(
+                f'{name}: {expected["ms"]} мс -> {result["ms"]} мс')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews-per-title', type=int, default=20)
+    parser.add_argument('--comments-per-review', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Файл для результатов в JSON')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Допустимый рост времени, доля (0.5 = 50%%)')
+    options = parser.parse_args()
+
+    teardown = setup_database()
+    try:
+        from django.db import connection
+        from rest_framework.test import APIClient
+        from reviews.models import User
+
+        populate(options)
+        client = APIClient()
+        client.force_authenticate(User.objects.create(
+            username='bench_admin', email='bench_admin@yamdb.fake',
+            role=User.ADMIN,
+        ))
+        results = {
+            'machine': platform.node(),
+            'scale': {
+                'vendor': connection.vendor,
+                'users': options.users,
+                'titles': options.titles,
+                'reviews_per_title': options.reviews_per_title,
+                'comments_per_review': options.comments_per_review,
+            },
+            'cases': {},
+        }
+        for name, url, params in get_cases():
+            result = run_case(client, url, params, options.repeat)
+            results['cases'][name] = result
+            print(f'{name:>28}: {result["status"]} '
+                  f'{result["queries"]:3} запросов {result["ms"]:9.2f} мс')
+    finally:
+        teardown()
+
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+    if options.save_baseline:
+        with open(options.baseline, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        return
+    try:
+        with open(options.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print('Эталон не найден, сравнение пропущено.', file=sys.stderr)
+        return
+    regressions = compare(results, baseline, options.tolerance)
+    for regression in regressions:
+        print(f'РЕГРЕССИЯ {regression}', file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
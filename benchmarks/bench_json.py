@@ -0,0 +1,101 @@
+"""
+Сравнивает JSONRenderer/JSONParser DRF (стандартный json) с
+ORJSONRenderer/ORJSONParser (api.renderers, api.parsers) на ответах API:
+страницах произведений, отзывов и комментариев и выгрузке каталога
+на синтетических данных (manage.py generate_data).
+Проверяет, что на этих ответах вывод совпадает побайтно
+(float с экспонентой и NaN в них нет, см. api.renderers).
+
+    python -m benchmarks.bench_json --titles 2000 --limit 100
+"""
+import argparse
+import sys
+from io import BytesIO
+
+from benchmarks.common import measure, setup_database
+
+
+def get_payloads(client, limit):
+    """Тела ответов API: имя и данные ответа (response.data)."""
+    from reviews.models import Comments, Review, Title
+
+    review = Review.objects.order_by('-comments_count', 'id').first()
+    urls = {
+        'titles': '/api/v1/titles/',
+        'reviews': f'/api/v1/titles/{review.title_id}/reviews/',
+        'comments': (f'/api/v1/titles/{review.title_id}/reviews/'
+                     f'{review.id}/comments/'),
+    }
+    payloads = {}
+    for name, url in urls.items():
+        payloads[name] = client.get(url, {'limit': limit}).data
+    from api.serializers import (CommentSerializer, GetTitleSerializer,
+                                 ReviewSerializer)
+
+    payloads['export'] = GetTitleSerializer(
+        Title.objects.prefetch_related('genre').select_related(
+            'category')[:limit * 10], many=True).data
+    payloads['reviews-models'] = ReviewSerializer(
+        Review.objects.select_related('author')[:limit * 10],
+        many=True).data
+    payloads['comments-models'] = CommentSerializer(
+        Comments.objects.select_related('author')[:limit * 10],
+        many=True).data
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=20)
+    options = parser.parse_args()
+
+    teardown = setup_database()
+    try:
+        from api import renderers
+        from api.parsers import ORJSONParser
+        from api.renderers import ORJSONRenderer
+        from django.core.management import call_command
+        from rest_framework.parsers import JSONParser
+        from rest_framework.renderers import JSONRenderer
+        from rest_framework.test import APIClient
+
+        if renderers.orjson is None:
+            print('orjson не установлен, сравнивать не с чем.',
+                  file=sys.stderr)
+            return
+        call_command('generate_data', users=200, titles=options.titles,
+                     reviews_per_title=10, comments_per_review=3,
+                     seed=options.seed, verbosity=0)
+        payloads = get_payloads(APIClient(), options.limit)
+    finally:
+        teardown()
+
+    mismatched = False
+    print(f'{"ответ":>16} {"КБ":>7} {"json, мс":>9} {"orjson, мс":>11} '
+          f'{"x":>5} {"разбор json":>12} {"orjson":>7} {"x":>5}')
+    for name, data in payloads.items():
+        body = JSONRenderer().render(data)
+        if ORJSONRenderer().render(data) != body:
+            mismatched = True
+            print(f'{name}: вывод отличается', file=sys.stderr)
+        timings = [
+            measure(lambda: renderer().render(data), options.repeat)
+            for renderer in (JSONRenderer, ORJSONRenderer)
+        ] + [
+            measure(lambda: parser().parse(BytesIO(body)), options.repeat)
+            for parser in (JSONParser, ORJSONParser)
+        ]
+        render, fast_render, parse, fast_parse = (
+            timing * 1000 for timing in timings)
+        print(f'{name:>16} {len(body) / 1024:7.1f} {render:9.2f} '
+              f'{fast_render:11.2f} {render / fast_render:5.1f} '
+              f'{parse:12.2f} {fast_parse:7.2f} {parse / fast_parse:5.1f}')
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
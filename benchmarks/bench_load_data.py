@@ -0,0 +1,102 @@
+"""
+Измеряет скорость manage.py load_data (строк в секунду) на синтетических
+csv файлах.
+
+    python -m benchmarks.bench_load_data --titles 5000 --reviews-per-title 20
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import setup_database
+
+HEADERS = {
+    'users': ('id', 'username', 'email', 'role', 'bio', 'first_name',
+              'last_name'),
+    'genre': ('id', 'name', 'slug'),
+    'category': ('id', 'name', 'slug'),
+    'titles': ('id', 'name', 'year', 'category'),
+    'genre_title': ('id', 'title_id', 'genre_id'),
+    'review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+
+def generate_rows(options):
+    rnd = random.Random(options.seed)
+    users = options.users
+    yield 'users', (
+        (number, f'user{number}', f'user{number}@yamdb.fake', 'user', '',
+         '', '')
+        for number in range(1, users + 1)
+    )
+    yield 'genre', ((number, f'Жанр {number}', f'genre-{number}')
+                    for number in range(1, 21))
+    yield 'category', ((number, f'Категория {number}', f'category-{number}')
+                       for number in range(1, 6))
+    yield 'titles', ((number, f'Произведение {number}', 2000,
+                      rnd.randint(1, 5))
+                     for number in range(1, options.titles + 1))
+    yield 'genre_title', (
+        (number, number // 2 + 1, number % 20 + 1)
+        for number in range(0, options.titles * 2)
+    )
+    per_title = min(options.reviews_per_title, users)
+    reviews = options.titles * per_title
+    yield 'review', (
+        (number, (number - 1) // per_title + 1, 'Текст отзыва',
+         (number - 1) % per_title + 1, rnd.randint(1, 10),
+         '2022-01-01T00:00:00Z')
+        for number in range(1, reviews + 1)
+    )
+    yield 'comments', (
+        (number, (number - 1) % reviews + 1, 'Текст комментария',
+         rnd.randint(1, users), '2022-01-02T00:00:00Z')
+        for number in range(1, reviews * options.comments_per_review + 1)
+    )
+
+
+def write_files(data_dir, options):
+    total = 0
+    for name, rows in generate_rows(options):
+        with open(os.path.join(data_dir, f'{name}.csv'), 'w',
+                  encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(HEADERS[name])
+            for row in rows:
+                writer.writerow(row)
+                total += 1
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--reviews-per-title', type=int, default=10)
+    parser.add_argument('--comments-per-review', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    options = parser.parse_args()
+
+    teardown = setup_database()
+    try:
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            rows = write_files(data_dir, options)
+            start = time.perf_counter()
+            call_command('load_data', data_dir, verbosity=0,
+                         batch_size=options.batch_size)
+            seconds = time.perf_counter() - start
+        print(f'{rows} строк за {seconds:.2f} с: '
+              f'{rows / seconds:.0f} строк/с')
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
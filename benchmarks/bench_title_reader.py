@@ -0,0 +1,58 @@
+"""
+Сравнивает построение страниц списка произведений сериализатором
+GetTitleSerializer и TitleReader (api.readers) на синтетическом
+каталоге (manage.py generate_data). Печатает строки в секунду.
+
+    python -m benchmarks.bench_title_reader --titles 5000 --limit 100
+"""
+import argparse
+
+from benchmarks.common import measure, setup_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=20)
+    options = parser.parse_args()
+
+    teardown = setup_database()
+    try:
+        from api.readers import TitleReader
+        from api.serializers import GetTitleSerializer
+        from django.core.management import call_command
+        from reviews.models import Title
+
+        call_command('generate_data', users=100, titles=options.titles,
+                     reviews_per_title=5, comments_per_review=0,
+                     seed=options.seed, verbosity=0)
+        queryset = Title.objects.select_related(
+            'category').prefetch_related('genre').order_by('name')
+        limit = options.limit
+        reader = TitleReader()
+
+        def serializer_page():
+            return GetTitleSerializer(queryset[:limit], many=True).data
+
+        def reader_page():
+            return reader.to_representation(
+                reader.prepare(queryset)[:limit])
+
+        print(f'{options.titles} произведений, страница {limit} строк')
+        results = {}
+        for name, page in (('GetTitleSerializer', serializer_page),
+                           ('TitleReader', reader_page)):
+            page()
+            results[name] = measure(page, options.repeat)
+            print(f'{name:>20}: {results[name] * 1000:8.2f} мс, '
+                  f'{limit / results[name]:10.0f} строк/с')
+        print(f'Ускорение: '
+              f'{results["GetTitleSerializer"] / results["TitleReader"]:.1f}x')
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
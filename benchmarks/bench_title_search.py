@@ -0,0 +1,71 @@
+"""
+Сравнивает поиск произведений (?search=) с фильтром name__icontains
+на синтетическом каталоге.
+
+    python -m benchmarks.bench_title_search --titles 50000
+"""
+import argparse
+import random
+
+from benchmarks.common import measure, setup_database
+
+WORDS = (
+    'война', 'мир', 'звезда', 'ночь', 'город', 'море', 'время', 'тайна',
+    'король', 'дорога', 'сердце', 'тень', 'огонь', 'зима', 'лето', 'остров',
+    'песня', 'солнце', 'брат', 'сестра', 'дом', 'небо', 'река', 'лес',
+)
+
+
+def populate(count, seed):
+    from reviews.models import Category, Title
+
+    rnd = random.Random(seed)
+    category = Category.objects.create(name='Книги', slug='books')
+    batch = []
+    for number in range(1, count + 1):
+        name = ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 5)))
+        batch.append(Title(id=number, name=f'{name} {number}', year=2000,
+                           category=category))
+        if len(batch) == 5000:
+            Title.objects.bulk_create(batch)
+            batch = []
+    Title.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+
+    teardown = setup_database()
+    try:
+        from api.search import get_search_backend
+        from reviews.models import Title
+
+        populate(options.titles, options.seed)
+        backend = get_search_backend()
+        backend.search(Title.objects.all(), 'прогрев').count()
+        print(f'{options.titles} произведений, '
+              f'движок: {type(backend).__name__}')
+
+        def page(queryset):
+            # Как страница API: COUNT и первые 10 строк.
+            return queryset.count(), list(queryset[:10])
+
+        for query in ('мир', 'звезда ночь', 'остров сокровищ'):
+            icontains = measure(lambda: page(
+                Title.objects.filter(name__icontains=query)
+            ), options.repeat)
+            search = measure(lambda: page(
+                backend.search(Title.objects.all(), query)
+            ), options.repeat)
+            print(f'{query!r:>20}: icontains {icontains * 1000:8.2f} мс, '
+                  f'search {search * 1000:8.2f} мс')
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Общая подготовка окружения для бенчмарков.
+
+Бенчмарки запускаются из корня репозитория, например:
+    python -m benchmarks.bench_title_search
+По умолчанию используется SQLite в памяти; чтобы измерять на PostgreSQL,
+достаточно задать переменные окружения DB_ENGINE, DB_NAME и т.д.,
+как для самого проекта. Бенчмарк работает с отдельной тестовой базой.
+"""
+import os
+import statistics
+import sys
+import time
+from os.path import abspath, dirname, join
+
+ROOT_DIR = dirname(dirname(abspath(__file__)))
+sys.path.append(join(ROOT_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('DB_ENGINE', 'django.db.backends.sqlite3')
+
+
+def setup_database():
+    """Настраивает Django и создаёт тестовую базу с миграциями.
+    Возвращает функцию, удаляющую базу."""
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return teardown
+
+
+def measure(func, repeat=5):
+    """Возвращает медианное время выполнения func в секундах."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import token_cache, user_cache_key
+
+
+def bearer_client(user, lifetime=None):
+    token = AccessToken.for_user(user)
+    if lifetime is not None:
+        token.set_exp(lifetime=lifetime)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(context):
+    return [
+        query for query in context.captured_queries
+        if 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedJWTAuthentication:
+
+    @pytest.fixture(autouse=True)
+    def clear_tokens(self):
+        token_cache.clear()
+
+    def test_user_loaded_once(self, admin):
+        client = bearer_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            assert client.get('/api/v1/users/me/').status_code == 200
+        assert user_queries(context) == []
+
+    def test_per_process_cache_not_used(self, settings, admin):
+        settings.API_CACHE_SHARED = False
+        client = bearer_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            assert client.get('/api/v1/users/me/').status_code == 200
+        # Пользователь читается из базы при каждом запросе.
+        assert len(user_queries(context)) == 1
+
+    def test_role_change_invalidates(self, user, admin):
+        client = bearer_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        response = bearer_client(admin).patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 200
+
+    def test_inactive_user(self, user):
+        client = bearer_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_invalidated_after_commit(self, user):
+        bearer_client(user).get('/api/v1/users/me/')
+        key = user_cache_key(user.pk)
+        assert cache.get(key) is not None
+        with transaction.atomic():
+            user.is_active = False
+            user.save()
+            assert cache.get(key) is not None
+        assert cache.get(key) is None
+
+    def test_me_update_keeps_password(self, user):
+        client = bearer_client(user)
+        client.get('/api/v1/users/me/')
+        response = client.patch('/api/v1/users/me/', data={'bio': 'Текст'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.bio == 'Текст'
+        assert user.check_password('1234567')
+
+    def test_expired_cached_token(self, user):
+        client = bearer_client(user, lifetime=timedelta(seconds=-1))
+        assert client.get('/api/v1/users/me/').status_code == 401
+        client = bearer_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        cached = next(iter(token_cache.tokens.values()))
+        cached.set_exp(lifetime=timedelta(seconds=-1))
+        assert client.get('/api/v1/users/me/').status_code == 401
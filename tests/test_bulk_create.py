@@ -0,0 +1,77 @@
+import pytest
+from api.bulk import insert
+from django.db import connection
+from reviews.models import Genre, Title
+
+
+@pytest.mark.django_db
+class TestBulkCreate:
+
+    def test_titles(self, admin_client, user_client, category, genres):
+        data = [
+            {'name': 'Первое', 'year': 2001, 'category': 'movie',
+             'genre': ['drama', 'comedy']},
+            {'name': 'Второе', 'year': 2002, 'category': 'movie',
+             'genre': []},
+            {'name': 'Третье', 'year': 2003, 'category': 'book',
+             'genre': ['drama', 'horror']},
+            {'name': 'Четвёртое', 'year': 3000, 'category': 'movie',
+             'genre': []},
+        ]
+        url = '/api/v1/titles/bulk/'
+        assert user_client.post(url, data, format='json').status_code == 403
+
+        response = admin_client.post(url, data, format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'created', 'created', 'invalid', 'invalid']
+        assert set(results[2]['errors']) == {'category', 'genre'}
+        assert 'year' in results[3]['errors']
+        created = results[0]['data']
+        assert created['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert len(created['genre']) == 2
+        assert Title.objects.get(pk=created['id']).genre.count() == 2
+
+    def test_reviews(self, admin_client, title, authors):
+        data = [
+            {'author': 'author0', 'text': 'Ок', 'score': 8},
+            {'author': 'author1', 'text': 'Ок', 'score': 6},
+            {'author': 'author1', 'text': 'Повтор', 'score': 1},
+            {'author': 'nobody', 'text': 'Ок', 'score': 5},
+        ]
+        response = admin_client.post(f'/api/v1/titles/{title.id}/reviews/'
+                                     'bulk/', data, format='json')
+        assert response.status_code == 207
+        assert [result['status'] for result in response.json()] == [
+            'created', 'created', 'invalid', 'invalid']
+        title.refresh_from_db()
+        assert (title.reviews_count, title.rating) == (2, 7)
+
+    def test_not_a_list(self, admin_client):
+        response = admin_client.post('/api/v1/titles/bulk/', {'name': 'x'},
+                                     format='json')
+        assert response.status_code == 400
+
+    def test_insert_bulk_create(self, monkeypatch,
+                                django_assert_num_queries):
+        # SQLite не возвращает id из bulk_create, поэтому ветку
+        # для PostgreSQL проверяем подменой bulk_create.
+        monkeypatch.setattr(connection.features,
+                            'can_return_ids_from_bulk_insert', True)
+        calls = []
+        monkeypatch.setattr(Genre.objects, 'bulk_create', calls.append)
+        genres = [Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+                  for number in range(3)]
+        with django_assert_num_queries(0):
+            insert(Genre, genres)
+        assert calls == [genres]
+
+    def test_insert_one_by_one(self, monkeypatch, django_assert_num_queries):
+        monkeypatch.setattr(connection.features,
+                            'can_return_ids_from_bulk_insert', False)
+        genres = [Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+                  for number in range(3)]
+        with django_assert_num_queries(3):
+            insert(Genre, genres)
+        assert all(genre.pk for genre in genres)
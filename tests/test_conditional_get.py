@@ -0,0 +1,51 @@
+import pytest
+from reviews.models import Review
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    def test_reviews_etag(self, client, title, authors,
+                          django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        review = Review.objects.create(title=title, author=authors[0],
+                                       text='Ок', score=8)
+        response = client.get(url)
+        etag = response['ETag']
+        assert not etag.startswith('W/')
+        assert response['Last-Modified']
+
+        # Произведение и агрегат по отзывам, без выборки и сериализации.
+        with django_assert_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert not response.content
+
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+        review.text = 'Исправленный текст'
+        review.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_title_etag(self, client, title, authors):
+        url = f'/api/v1/titles/{title.id}/'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200
+
+        Review.objects.create(title=title, author=authors[0], text='Ок',
+                              score=8)
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_disabled_without_shared_cache(self, settings, client, title):
+        settings.API_CACHE_SHARED = False
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert 'ETag' not in response
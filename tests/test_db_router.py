@@ -0,0 +1,115 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.db_router import ReplicaRouter
+from reviews.models import Title
+
+
+@pytest.fixture
+def replica(settings):
+    # Вторая база SQLite с теми же данными: реплика смотрит
+    # на тестовую базу default через отдельное соединение.
+    connections.databases['replica'] = dict(
+        connections['default'].settings_dict)
+    settings.DATABASE_REPLICAS = ['replica']
+    yield connections['replica']
+    connections['replica'].close()
+    del connections['replica']
+    del connections.databases['replica']
+
+
+@pytest.fixture
+def replicas(replica, settings):
+    connections.databases['replica2'] = dict(
+        connections['default'].settings_dict)
+    settings.DATABASE_REPLICAS = ['replica', 'replica2']
+    yield
+    connections['replica2'].close()
+    del connections['replica2']
+    del connections.databases['replica2']
+
+
+def capture(client, method, url, **kwargs):
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        response = getattr(client, method)(url, **kwargs)
+    return response, len(primary.captured_queries), len(
+        replica.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouter:
+
+    def test_reads_go_to_replica(self, replica, title):
+        response, primary, replica = capture(
+            APIClient(), 'get', f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        assert primary == 0
+        assert replica > 0
+
+    def test_writer_sticks_to_primary(self, replica, title,
+                                      user_client, admin_client):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response, primary, _ = capture(
+            user_client, 'post', url, data={'text': 'Ок', 'score': 8})
+        assert response.status_code == 201
+        assert primary > 0
+
+        response, primary, replica = capture(user_client, 'get', url)
+        assert response.json()['count'] == 1
+        assert (primary > 0, replica) == (True, 0)
+
+        response, primary, replica = capture(admin_client, 'get', url)
+        assert (primary, replica > 0) == (0, True)
+
+    def test_pin_expires(self, replica, settings, title, user_client):
+        settings.API_REPLICA_PIN_SECONDS = 0
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, data={'text': 'Ок', 'score': 8})
+        _, primary, replica = capture(user_client, 'get', url)
+        assert (primary, replica > 0) == (0, True)
+
+    def test_cache_fill_reads_primary(self, replica, title):
+        url = f'/api/v1/titles/{title.id}/'
+        response, primary, replica_queries = capture(APIClient(), 'get', url)
+        assert response['X-Cache'] == 'MISS'
+        assert (primary > 0, replica_queries) == (True, 0)
+        response, primary, _ = capture(APIClient(), 'get', url)
+        assert (response['X-Cache'], primary) == ('HIT', 0)
+
+    def test_export_streams_from_replica(self, replica, title, admin):
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get('/api/v1/titles/export/')
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            assert b''.join(response.streaming_content)
+        assert (len(primary.captured_queries),
+                len(replica.captured_queries) > 0) == (0, True)
+
+    def test_no_replicas_without_shared_cache(self, replica, settings,
+                                              title):
+        settings.API_CACHE_SHARED = False
+        _, primary, replica = capture(
+            APIClient(), 'get', f'/api/v1/titles/{title.id}/reviews/')
+        assert (primary > 0, replica) == (True, 0)
+
+    def test_one_replica_per_request(self, replicas, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        for _ in range(5):
+            with CaptureQueriesContext(connections['replica']) as first, \
+                    CaptureQueriesContext(connections['replica2']) as second:
+                APIClient().get(url)
+            counts = sorted([len(first.captured_queries),
+                             len(second.captured_queries)])
+            assert counts[0] == 0 and counts[1] > 1
+
+
+def test_router_without_replicas(settings):
+    settings.DATABASE_REPLICAS = []
+    router = ReplicaRouter()
+    assert router.db_for_read(Title) == 'default'
+    assert router.db_for_write(Title) == 'default'
+    assert router.allow_migrate('default', 'reviews')
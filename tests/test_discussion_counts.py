@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import post_delete
+from reviews.counters import recount_reviews
+from reviews.models import Comments, Review, Title
+from reviews.signals import deleting
+
+
+@pytest.fixture
+def reviews(title, authors):
+    reviews = [
+        Review.objects.create(title=title, author=author, text='.', score=5)
+        for author in authors[:3]
+    ]
+    for review, number in zip(reviews, (2, 0, 5)):
+        for author in authors[:number]:
+            Comments.objects.create(review=review, author=author, text='.')
+    return reviews
+
+
+@pytest.mark.django_db
+class TestDiscussionCounts:
+
+    def test_comments_count_follows_comments(self, reviews, authors):
+        first, second, third = reviews
+        comment = third.comments.first()
+        comment.review = second
+        comment.save()
+        first.comments.first().delete()
+        second.delete()
+        counts = dict(Review.objects.values_list('pk', 'comments_count'))
+        assert counts == {first.pk: 1, third.pk: 4}
+        assert recount_reviews(check=True) == (2, 0)
+
+    def test_payloads(self, client, title, reviews,
+                      django_assert_num_queries):
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['reviews_count'] == 3
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        # Произведение, агрегат для ETag, COUNT, отзывы с авторами.
+        with django_assert_num_queries(4):
+            response = client.get(url, {'ordering': '-comments_count'})
+        assert [review['comments_count']
+                for review in response.json()['results']] == [5, 2, 0]
+
+    def test_most_discussed_titles(self, client, title, reviews, authors):
+        other = Title.objects.create(name='Другое', year=2000)
+        for author in authors:
+            Review.objects.create(title=other, author=author, text='.',
+                                  score=5)
+        response = client.get('/api/v1/titles/',
+                              {'ordering': '-reviews_count'})
+        assert [row['id'] for row in response.json()['results']] == [
+            other.id, title.id]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reviews_list_sees_new_comment(self, user_client, title,
+                                           reviews):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = user_client.get(url)['ETag']
+        user_client.post(f'{url}{reviews[1].id}/comments/', {'text': 'Ок'})
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['results'][1]['comments_count'] == 1
+
+    def test_rebuild_counters(self, reviews):
+        Review.objects.update(comments_count=0)
+        with pytest.raises(Exception):
+            call_command('rebuild_counters', check=True)
+        call_command('rebuild_counters')
+        assert Review.objects.get(pk=reviews[2].pk).comments_count == 5
+
+    def test_failed_delete_does_not_disable_counter(self, reviews, authors):
+        def fail(**kwargs):
+            raise RuntimeError('Ошибка при удалении')
+
+        review = reviews[0]
+        post_delete.connect(fail, sender=Comments)
+        try:
+            with pytest.raises(RuntimeError), transaction.atomic():
+                review.delete()
+        finally:
+            post_delete.disconnect(fail, sender=Comments)
+        other_thread = []
+        thread = threading.Thread(
+            target=lambda: other_thread.append(review.pk in deleting(
+                'reviews')))
+        thread.start()
+        thread.join()
+        assert other_thread == [False]
+        assert review.pk in deleting('reviews')
+
+        request_started.send(sender=None)
+        Comments.objects.create(review=review, author=authors[0], text='.')
+        assert Review.objects.get(pk=review.pk).comments_count == 3
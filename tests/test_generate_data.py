@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+from reviews.counters import recount_titles
+from reviews.models import Comments, Review, Title, User
+
+OPTIONS = {'users': 50, 'titles': 40, 'reviews_per_title': 10,
+           'comments_per_review': 2, 'verbosity': 0}
+
+
+def snapshot():
+    return (
+        list(Title.objects.order_by('id').values_list('name', 'year')),
+        list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score')),
+        Comments.objects.count(),
+    )
+
+
+@pytest.mark.django_db
+def test_generate_data():
+    call_command('generate_data', seed=3, **OPTIONS)
+    assert User.objects.count() == 50
+    assert Title.objects.count() == 40
+    reviews = Review.objects.count()
+    assert 300 <= reviews <= 500
+    assert 0 < Comments.objects.count() < reviews * 4
+    assert not Comments.objects.filter(
+        pub_date__lt=F('review__pub_date')).exists()
+    assert recount_titles(check=True)[1] == 0
+
+    counts = sorted(Title.objects.values_list('reviews_count', flat=True))
+    # Популярные произведения собирают заметно больше отзывов.
+    assert counts[-1] >= 4 * counts[len(counts) // 2]
+    assert counts[-1] <= 50
+    assert not Review.objects.values('title', 'author').annotate(
+        number=Count('id')).filter(number__gt=1).exists()
+
+
+@pytest.mark.django_db
+def test_generate_data_seed():
+    call_command('generate_data', seed=7, **OPTIONS)
+    first = snapshot()
+    Title.objects.all().delete()
+    User.objects.all().delete()
+    call_command('generate_data', seed=7, **OPTIONS)
+    assert snapshot() == first
+
+    call_command('generate_data', seed=8, **OPTIONS)
+    assert User.objects.count() == 100
+
+
+@pytest.mark.django_db(transaction=True)
+def test_generate_data_invalidates_cache(client):
+    url = '/api/v1/titles/'
+    etag = client.get(url)['ETag']
+    assert client.get(url)['X-Cache'] == 'HIT'
+    call_command('generate_data', seed=3, **OPTIONS)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()['count'] == 40
@@ -0,0 +1,101 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from api import parsers, renderers
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnList
+
+MOSCOW = datetime.timezone(datetime.timedelta(hours=3))
+PAYLOADS = (
+    {'name': 'Война и мир', 'text': 'Строка\u2028 с разделителем\u2029'},
+    {'pub_date': datetime.datetime(2022, 10, 2, 13, 20, 5, 123456,
+                                   tzinfo=datetime.timezone.utc),
+     'local': datetime.datetime(2022, 10, 2, 16, 20, tzinfo=MOSCOW),
+     'naive': datetime.datetime(2022, 10, 2), 'day': datetime.date.today(),
+     'time': datetime.time(12, 30)},
+    {'rating': Decimal('7.50'), 'mean': 8.25, 'count': 3, 'none': None,
+     'flags': [True, False], 'id': uuid.UUID(int=1)},
+    {1: 'one', 'label': gettext_lazy('Отзыв'), 'ids': (1, 2)},
+    ReturnList([{'id': 1, 'genre': []}], serializer=None),
+    {'big': 2 ** 70},
+    [],
+)
+
+
+class TestORJSONRenderer:
+
+    @pytest.mark.parametrize('data', PAYLOADS)
+    def test_same_bytes(self, data):
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_float_differences(self):
+        # Известные отличия от JSONRenderer, см. ORJSONRenderer.
+        assert ORJSONRenderer().render([1e16, 1e-7]) == b'[1e16,1e-7]'
+        assert JSONRenderer().render([1e16, 1e-7]) == b'[1e+16,1e-07]'
+        assert ORJSONRenderer().render({'a': float('nan')}) == b'{"a":null}'
+        with pytest.raises(ValueError):
+            JSONRenderer().render({'a': float('nan')})
+
+    def test_indent_and_empty(self):
+        data = {'name': 'Мир'}
+        assert ORJSONRenderer().render(
+            data, 'application/json; indent=2'
+        ) == JSONRenderer().render(data, 'application/json; indent=2')
+        assert ORJSONRenderer().render(None) == b''
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert ORJSONRenderer().render(PAYLOADS[1]) == (
+            JSONRenderer().render(PAYLOADS[1]))
+
+    @pytest.mark.django_db
+    def test_api_response(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.content == JSONRenderer().render(response.data)
+
+
+class TestORJSONParser:
+
+    @pytest.mark.parametrize('body', (
+        '{"text": "Отличный фильм", "score": 8}',
+        '[1, 2.5, null, true, {"a": []}]',
+        '{"big": 12345678901234567890123}',
+    ))
+    def test_same_data(self, body):
+        body = body.encode()
+        assert ORJSONParser().parse(BytesIO(body)) == (
+            JSONParser().parse(BytesIO(body)))
+
+    @pytest.mark.parametrize('body', (b'{"text": ', b'{"a": NaN}'))
+    def test_same_errors(self, body):
+        with pytest.raises(ParseError) as expected:
+            JSONParser().parse(BytesIO(body))
+        with pytest.raises(ParseError) as error:
+            ORJSONParser().parse(BytesIO(body))
+        assert str(error.value) == str(expected.value)
+
+    def test_other_encoding(self, monkeypatch):
+        body = '{"name": "Мир"}'.encode('utf-16')
+        context = {'encoding': 'utf-16'}
+        assert ORJSONParser().parse(BytesIO(body), None, context) == {
+            'name': 'Мир'}
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert ORJSONParser().parse(BytesIO(b'{"a": 1}')) == {'a': 1}
+
+    @pytest.mark.django_db
+    def test_api_request(self, user_client, title):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data='{"text": "Хорошо", "score": 9}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201
+        assert response.json()['text'] == 'Хорошо'
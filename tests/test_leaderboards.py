@@ -0,0 +1,136 @@
+import random
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError
+from reviews import signals
+from reviews.leaderboards import (OVERALL, category_board, genre_board,
+                                  ranked_titles, update_title)
+from reviews.models import Category, LeaderboardEntry, Review, Title
+
+
+def board_titles(board):
+    return list(LeaderboardEntry.objects.filter(board=board).order_by(
+        '-score', 'title_id').values_list('title_id', flat=True))
+
+
+def expected_titles(board, size):
+    return list(ranked_titles(board).values_list('pk', flat=True)[:size])
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLeaderboards:
+
+    def test_bayesian_order(self, authors, category, genres):
+        rare = Title.objects.create(name='Одна десятка', year=2000,
+                                    category=category)
+        popular = Title.objects.create(name='Много девяток', year=2000,
+                                       category=category)
+        Review.objects.create(title=rare, author=authors[0], text='.',
+                              score=10)
+        for author in authors:
+            Review.objects.create(title=popular, author=author, text='.',
+                                  score=9)
+        assert board_titles(OVERALL) == [popular.pk, rare.pk]
+        assert board_titles(category_board(category.pk)) == [
+            popular.pk, rare.pk]
+
+    def test_incremental_matches_rebuild(self, settings, authors, genres):
+        settings.LEADERBOARD_SIZE = 3
+        rnd = random.Random(5)
+        categories = [
+            Category.objects.create(name=f'Категория {number}',
+                                    slug=f'category-{number}')
+            for number in range(2)
+        ]
+        titles = []
+        for number in range(8):
+            title = Title.objects.create(name=f'Произведение {number}',
+                                         year=2000,
+                                         category=rnd.choice(categories))
+            title.genre.set(rnd.sample(genres, rnd.randint(1, 2)))
+            titles.append(title)
+        boards = [OVERALL] + [category_board(item.pk) for item in categories]
+        boards += [genre_board(genre.pk) for genre in genres]
+        for _ in range(60):
+            title, author = rnd.choice(titles), rnd.choice(authors)
+            review = Review.objects.filter(title=title, author=author).first()
+            action = rnd.random()
+            if review is None:
+                Review.objects.create(title=title, author=author, text='.',
+                                      score=rnd.randint(1, 10))
+            elif action < 0.5:
+                review.score = rnd.randint(1, 10)
+                review.save()
+            elif action < 0.8:
+                review.delete()
+            else:
+                title.refresh_from_db()
+                title.category = rnd.choice(categories)
+                title.save()
+                title.genre.set(rnd.sample(genres, rnd.randint(1, 2)))
+            for board in boards:
+                assert board_titles(board) == expected_titles(board, 3)
+        titles[0].delete()
+        for board in boards:
+            assert board_titles(board) == expected_titles(board, 3)
+
+    def test_title_below_full_board(self, settings, authors,
+                                    django_assert_num_queries):
+        settings.LEADERBOARD_SIZE = 2
+        for number in range(2):
+            good = Title.objects.create(name=f'Хорошее {number}', year=2000)
+            Review.objects.create(title=good, author=authors[0], text='.',
+                                  score=10)
+        bad = Title.objects.create(name='Плохое', year=2000)
+        Review.objects.create(title=bad, author=authors[0], text='.',
+                              score=1)
+        # Произведение, жанры и статистика рейтингов - без записи.
+        with django_assert_num_queries(3):
+            update_title(bad.pk)
+        assert bad.pk not in board_titles(OVERALL)
+
+    def test_review_error_is_not_duplicate(self, monkeypatch, user_client,
+                                           title):
+        def fail(*args, **kwargs):
+            raise IntegrityError('CHECK constraint failed')
+
+        monkeypatch.setattr(signals, 'shift_histogram', fail)
+        with pytest.raises(IntegrityError):
+            user_client.post(f'/api/v1/titles/{title.id}/reviews/',
+                             data={'text': 'Ок', 'score': 8})
+        assert not title.reviews.exists()
+
+    def test_rebuild_command(self, title, authors):
+        Review.objects.create(title=title, author=authors[0], text='.',
+                              score=7)
+        LeaderboardEntry.objects.all().delete()
+        call_command('rebuild_leaderboards')
+        assert LeaderboardEntry.objects.count() == 4
+
+    def test_api(self, client, title, genres, authors,
+                 django_assert_num_queries):
+        Review.objects.create(title=title, author=authors[0], text='.',
+                              score=7)
+        other = Title.objects.create(name='Другое', year=2000)
+        Review.objects.create(title=other, author=authors[0], text='.',
+                              score=5)
+        # Записи рейтинга, счётчик для пагинации и жанры произведений.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/leaderboards/')
+        data = response.json()
+        assert data['count'] == 2
+        assert [(row['position'], row['title']['id'])
+                for row in data['results']] == [(1, title.pk), (2, other.pk)]
+        assert data['results'][0]['title']['genre']
+
+        response = client.get('/api/v1/leaderboards/', {'offset': 1})
+        assert response.json()['results'][0]['position'] == 2
+
+        response = client.get(f'/api/v1/leaderboards/genres/{genres[0].slug}/')
+        assert [row['title']['id'] for row in response.json()['results']] == [
+            title.pk]
+        response = client.get('/api/v1/leaderboards/categories/movie/')
+        assert response.json()['count'] == 1
+        assert client.get(
+            '/api/v1/leaderboards/genres/unknown/').status_code == 404
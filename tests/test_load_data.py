@@ -0,0 +1,117 @@
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+FILES = {
+    'users.csv': 'id,username,email,role,bio,first_name,last_name\n'
+                 '1,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+                 '2,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n',
+    'titles.csv': 'id,name,year,category\n1,Побег из Шоушенка,1994,1\n',
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,1,2\n',
+    'review.csv': 'id,title_id,text,author,score,pub_date\n'
+                  '1,1,Шедевр,1,10,2019-09-24T21:08:21.567Z\n'
+                  '2,1,Неплохо,2,7,2019-09-24T21:08:21.567Z\n',
+    'comments.csv': 'id,review_id,text,author,pub_date\n'
+                    '1,1,Согласен,2,2019-09-24T21:08:21.567Z\n',
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, content in FILES.items():
+        (tmp_path / name).write_text(content, encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+def test_load_data(data_dir):
+    call_command('load_data', str(data_dir), batch_size=1, verbosity=0)
+    title = Title.objects.get()
+    assert sorted(title.genre.values_list('slug', flat=True)) == [
+        'comedy', 'drama']
+    assert (title.reviews_count, title.rating) == (2, 8.5)
+    assert Review.objects.get(pk=1).pub_date.year == 2019
+    assert Comments.objects.get().author.username == 'capt_obvious'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_failure_discards_tables(data_dir):
+    Genre.objects.create(id=10, name='Ужасы', slug='horror')
+    (data_dir / 'comments.csv').unlink()
+    with pytest.raises(CommandError):
+        call_command('load_data', str(data_dir), parallel=True, verbosity=0)
+    assert not User.objects.exists()
+    assert not Category.objects.exists()
+    assert list(Genre.objects.values_list('slug', flat=True)) == ['horror']
+    assert not Title.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_load_data_invalidates_cache(data_dir, client):
+    url = '/api/v1/titles/'
+    response = client.get(url)
+    etag = response['ETag']
+    assert response.json()['count'] == 0
+    assert client.get(url)['X-Cache'] == 'HIT'
+
+    call_command('load_data', str(data_dir), verbosity=0)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['X-Cache'] == 'MISS'
+    assert response.json()['count'] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('true, false', (('True', 'False'), ('t', 'f')))
+def test_load_user_flags(data_dir, true, false):
+    (data_dir / 'users.csv').write_text(
+        'id,username,email,is_staff,is_superuser,is_active\n'
+        f'1,bingobongo,bingobongo@yamdb.fake,{false},{false},{false}\n'
+        f'2,capt_obvious,capt_obvious@yamdb.fake,{true},{true},{true}\n',
+        encoding='utf-8')
+    call_command('load_data', str(data_dir), verbosity=0)
+    assert list(User.objects.order_by('pk').values_list(
+        'is_staff', 'is_superuser', 'is_active')) == [
+        (False, False, False), (True, True, True)]
+
+
+def test_copy_column_casts_flags():
+    from reviews.management.commands._export_data_funcs import copy_column
+
+    assert copy_column(User, 'is_active', 'is_active') == (
+        'CASE WHEN "is_active" THEN \'True\' ELSE \'False\' END '
+        'AS "is_active"')
+    assert copy_column(User, 'id', 'id') == '"id" AS "id"'
+
+
+def dump_tables():
+    from reviews.management.commands._export_data_funcs import TABLES
+
+    return [
+        list(model.objects.order_by('pk').values_list(
+            *[attname for _, attname in columns]
+        ))
+        for _, model, columns in TABLES
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('options', (
+    {'format': 'csv'},
+    {'format': 'ndjson', 'gzip': True, 'jobs': 3},
+))
+def test_export_round_trip(data_dir, tmp_path_factory, options):
+    call_command('load_data', str(data_dir), verbosity=0)
+    User.objects.filter(pk=1).update(is_active=False)
+    User.objects.filter(pk=2).update(
+        is_staff=True, is_superuser=True, password='pbkdf2_sha256$1$s$h')
+    export_dir = tmp_path_factory.mktemp('export')
+    call_command('export_data', str(export_dir), **options)
+    dump = dump_tables()
+    for model in (User, Genre, Category, Title):
+        model.objects.all().delete()
+
+    call_command('load_data', str(export_dir), verbosity=0)
+    assert dump_tables() == dump
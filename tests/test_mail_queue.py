@@ -0,0 +1,53 @@
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+
+from api.mail import MailQueue, mail_queue
+
+
+class BrokenConnection:
+    def __init__(self, failures):
+        self.failures = failures
+
+    def open(self):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('SMTP недоступен')
+
+    def send_messages(self, messages):
+        mail.outbox.extend(messages)
+        return len(messages)
+
+    def close(self):
+        pass
+
+
+@pytest.mark.django_db
+class TestMailQueue:
+
+    def test_signup_sends_in_background(self, client, settings):
+        settings.EMAIL_QUEUE_ASYNC = True
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'new_user', 'email': 'new_user@yamdb.fake'})
+        assert response.status_code == 200
+        assert mail_queue.flush(timeout=5)
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new_user@yamdb.fake']
+        assert 'confirmation_code' in mail.outbox[0].body
+
+    def test_sync_mode(self, settings):
+        settings.EMAIL_QUEUE_ASYNC = False
+        MailQueue().enqueue(EmailMessage('Тема', 'Текст', to=['a@b.c']))
+        assert len(mail.outbox) == 1
+
+    def test_retry_with_backoff(self, settings, monkeypatch):
+        settings.EMAIL_QUEUE_ASYNC = True
+        settings.EMAIL_QUEUE_BACKOFF = 0
+        connection = BrokenConnection(failures=2)
+        monkeypatch.setattr('api.mail.get_connection', lambda: connection)
+        queue = MailQueue()
+        for number in range(3):
+            queue.enqueue(EmailMessage('Тема', str(number), to=['a@b.c']))
+        assert queue.flush(timeout=5)
+        assert sorted(message.body for message in mail.outbox) == [
+            '0', '1', '2']
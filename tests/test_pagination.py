@@ -0,0 +1,47 @@
+import pytest
+from reviews.models import Comments, Review
+
+
+@pytest.fixture
+def comments(title, authors):
+    review = Review.objects.create(title=title, author=authors[0],
+                                   text='Текст', score=5)
+    Comments.objects.bulk_create([
+        Comments(review=review, author=authors[number % 10],
+                 text=f'Комментарий {number}')
+        for number in range(23)
+    ])
+    return review
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_walk_forward_and_back(self, client, title, comments):
+        url = f'/api/v1/titles/{title.id}/reviews/{comments.id}/comments/'
+        expected = [
+            comment['id'] for comment in
+            client.get(url, {'limit': 100}).json()['results']
+        ]
+        assert len(expected) == 23
+
+        response = client.get(url, {'pagination': 'cursor', 'limit': 5})
+        data = response.json()
+        assert 'count' not in data and data['previous'] is None
+        pages = [[comment['id'] for comment in data['results']]]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append([comment['id'] for comment in data['results']])
+        assert sum(pages, []) == expected
+        assert len(pages[-1]) == 3
+
+        backwards = []
+        while data['previous']:
+            data = client.get(data['previous']).json()
+            backwards.append([comment['id'] for comment in data['results']])
+        assert backwards == pages[-2::-1]
+
+    def test_invalid_cursor(self, client, title, comments):
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/',
+                              {'cursor': 'broken'})
+        assert response.status_code == 404
@@ -0,0 +1,44 @@
+import json
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+
+
+def timings(response):
+    return dict(
+        item.strip().split(';', 1)
+        for item in response['Server-Timing'].split(',')
+    )
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+
+    def test_disabled_by_default(self, client, title):
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing')
+
+    def test_server_timing(self, settings, title, caplog):
+        settings.API_PROFILING = True
+        caplog.set_level(logging.INFO, logger='api.profiling')
+        response = APIClient().get('/api/v1/titles/')
+        assert response.status_code == 200
+        header = timings(response)
+        assert set(header) == {'db', 'serializer', 'view', 'total'}
+        assert 'queries"' in header['db']
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['view'] == 'TitleViewSet.list'
+        assert record['queries'] > 0
+        assert record['slow'] is False
+        assert caplog.records[-1].levelno == logging.INFO
+
+    def test_slow_request(self, settings, title, caplog):
+        settings.API_PROFILING = True
+        settings.API_PROFILING_MAX_QUERIES = 0
+        APIClient().get(f'/api/v1/titles/{title.id}/')
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['view'] == 'TitleViewSet.retrieve'
+        assert record['slow'] is True
+        assert caplog.records[-1].levelno == logging.WARNING
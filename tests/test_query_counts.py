@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comments, Review, Title
+
+
+@pytest.fixture
+def catalog(category, genres, authors):
+    titles = []
+    for number in range(15):
+        title = Title.objects.create(name=f'Произведение {number}',
+                                     year=2000, category=category)
+        title.genre.set(genres)
+        titles.append(title)
+    title = titles[0]
+    for author in authors:
+        review = Review.objects.create(title=title, author=author,
+                                       text='Текст', score=7)
+        for commenter in authors:
+            Comments.objects.create(review=review, author=commenter,
+                                    text='Комментарий')
+    return title
+
+
+@pytest.mark.django_db
+class TestQueryCounts:
+    """Количество запросов к базе не зависит от размера страницы."""
+
+    @pytest.mark.parametrize('limit', (1, 10))
+    def test_title_list(self, client, catalog, limit,
+                        django_assert_num_queries):
+        # COUNT, произведения с категориями, жанры.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/', {'limit': limit})
+        assert len(response.json()['results']) == limit
+
+    def test_title_detail(self, client, catalog, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            client.get(f'/api/v1/titles/{catalog.id}/')
+
+    @pytest.mark.parametrize('limit', (1, 10))
+    def test_review_list(self, client, catalog, limit,
+                         django_assert_num_queries):
+        # Произведение, агрегат для ETag, COUNT, отзывы с авторами.
+        with django_assert_num_queries(4):
+            response = client.get(f'/api/v1/titles/{catalog.id}/reviews/',
+                                  {'limit': limit})
+        assert len(response.json()['results']) == limit
+
+    @pytest.mark.parametrize('limit', (1, 10))
+    def test_comment_list(self, client, catalog, limit,
+                          django_assert_num_queries):
+        review = catalog.reviews.first()
+        # Отзыв, агрегат для ETag, COUNT, комментарии с авторами.
+        with django_assert_num_queries(4):
+            response = client.get(
+                f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/',
+                {'limit': limit}
+            )
+        assert len(response.json()['results']) == limit
+
+    def test_review_create(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ок', 'score': 8})
+        assert response.status_code == 201
+        # Произведение, INSERT отзыва, UPDATE счётчиков и распределения
+        # оценок произведения. Места в рейтингах пересчитываются после
+        # фиксации транзакции (reviews.leaderboards.schedule_update).
+        assert len([
+            query for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]) == 4
+
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == 400
+        assert 'non_field_errors' in response.json()
+        assert title.reviews.count() == 1
+
+    def test_comment_route_checks_title(self, client, catalog):
+        review = catalog.reviews.first()
+        other_title = Title.objects.exclude(pk=catalog.pk).first()
+        response = client.get(
+            f'/api/v1/titles/{other_title.id}/reviews/{review.id}/comments/'
+        )
+        assert response.status_code == 404
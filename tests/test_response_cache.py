@@ -0,0 +1,49 @@
+import pytest
+from api.cache import CATALOG_SCOPE, bump_version, get_stats, get_version
+from django.db import transaction
+from reviews.models import Genre, Review
+from reviews.signals import bulk_loaded
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_hit_and_invalidation(self, client, title, authors,
+                                  django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url)['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response['X-Cache'] == 'HIT'
+        assert response.json()['rating'] is None
+        assert get_stats() == {'hits': 1, 'misses': 1}
+
+        Review.objects.create(title=title, author=authors[0], text='Ок',
+                              score=8)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8
+
+    def test_query_params_are_normalized(self, client, genres):
+        client.get('/api/v1/genres/', {'search': 'е', 'limit': 5})
+        response = client.get('/api/v1/genres/?limit=5&search=%D0%B5')
+        assert response['X-Cache'] == 'HIT'
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+
+        Genre.objects.create(name='Детектив', slug='detective')
+        response = client.get('/api/v1/genres/', {'search': 'е', 'limit': 5})
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 2
+
+    def test_bulk_loaded_bumps_all_scopes(self, title):
+        scopes = (CATALOG_SCOPE, f'reviews:{title.id}')
+        before = [get_version(scope) for scope in scopes]
+        bulk_loaded.send(sender=None)
+        assert [get_version(scope) - 1 for scope in scopes] == before
+
+    def test_version_bumped_after_commit(self):
+        before = get_version(CATALOG_SCOPE)
+        with transaction.atomic():
+            bump_version(CATALOG_SCOPE)
+            assert get_version(CATALOG_SCOPE) == before
+        assert get_version(CATALOG_SCOPE) > before
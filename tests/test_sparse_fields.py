@@ -0,0 +1,66 @@
+import pytest
+from reviews.models import Comments, Review, Title
+
+
+@pytest.fixture
+def catalog(category, genres, authors):
+    for number in range(3):
+        title = Title.objects.create(name=f'Произведение {number}',
+                                     year=2000, category=category,
+                                     description='Длинное описание')
+        title.genre.set(genres)
+    review = Review.objects.create(title=title, author=authors[0],
+                                   text='Текст', score=7)
+    Comments.objects.create(review=review, author=authors[1], text='Ок')
+    return title
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_title_fields(self, client, catalog, django_assert_num_queries):
+        # COUNT и произведения - без категорий и жанров.
+        with django_assert_num_queries(2) as context:
+            response = client.get('/api/v1/titles/',
+                                  {'fields': 'id,name,rating'})
+        assert response.status_code == 200
+        assert set(response.json()['results'][0]) == {'id', 'name',
+                                                       'rating'}
+        sql = context.captured_queries[-1]['sql']
+        assert 'description' not in sql
+        assert 'reviews_category' not in sql
+
+    def test_title_omit(self, client, catalog, django_assert_num_queries):
+        # Категория присоединяется, жанры не запрашиваются.
+        with django_assert_num_queries(1):
+            response = client.get(f'/api/v1/titles/{catalog.id}/',
+                                  {'omit': 'description,genre'})
+        data = response.json()
+        assert 'description' not in data and 'genre' not in data
+        assert data['category']['slug'] == catalog.category.slug
+
+    def test_reviews_and_comments(self, client, catalog):
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        response = client.get(url, {'fields': 'id,score',
+                                    'pagination': 'cursor'})
+        assert response.json()['results'] == [
+            {'id': catalog.reviews.get().id, 'score': 7}]
+        review = catalog.reviews.get()
+        response = client.get(f'{url}{review.id}/comments/',
+                              {'omit': 'author,review'})
+        assert set(response.json()['results'][0]) == {'id', 'text',
+                                                       'pub_date'}
+
+    def test_unknown_field(self, client, catalog):
+        response = client.get('/api/v1/titles/', {'fields': 'id,secret'})
+        assert response.status_code == 400
+        assert 'fields' in response.json()
+
+    def test_writes_ignore_fields(self, admin_client, category, genres):
+        response = admin_client.post(
+            '/api/v1/titles/?fields=id',
+            data={'name': 'Новое', 'year': 2000, 'category': category.slug,
+                  'genre': [genre.slug for genre in genres]},
+        )
+        assert response.status_code == 201
+        assert 'genre' in response.json()
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+from api.utils import iter_ndjson
+from api.serializers import GetTitleSerializer
+from api.views import TitleViewSet
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleExport:
+
+    def test_export(self, admin_client, user_client, title, category):
+        Title.objects.create(name='Без жанров', year=2000, category=None)
+        assert user_client.get('/api/v1/titles/export/').status_code == 403
+
+        response = admin_client.get('/api/v1/titles/export/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert [row['name'] for row in rows] == [
+            'Побег из Шоушенка', 'Без жанров']
+        assert rows[0]['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert len(rows[0]['genre']) == 2
+        assert rows[1]['category'] is None
+
+    def test_queries_per_chunk(self, category, django_assert_num_queries):
+        Title.objects.bulk_create([
+            Title(name=f'Произведение {number}', year=2000,
+                  category=category)
+            for number in range(10)
+        ])
+        # Четыре пачки по 3 произведения (последняя неполная) и пустая:
+        # по запросу произведений и жанров на пачку.
+        with django_assert_num_queries(9):
+            lines = list(iter_ndjson(TitleViewSet.queryset,
+                                     GetTitleSerializer, chunk_size=3))
+        assert len(lines) == 20
@@ -0,0 +1,46 @@
+import pytest
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog(category, genres):
+    drama, comedy = genres
+    book = Category.objects.create(name='Книга', slug='book')
+    horror = Genre.objects.create(name='Ужасы', slug='horror')
+    data = (
+        ('Драмеди', 1990, category, (drama, comedy)),
+        ('Драма', 2000, category, (drama,)),
+        ('Комедия', 2010, book, (comedy,)),
+        ('Ужастик', 2020, book, (horror,)),
+    )
+    for name, year, title_category, title_genres in data:
+        title = Title.objects.create(name=name, year=year,
+                                     category=title_category)
+        title.genre.set(title_genres)
+
+
+def names(client, **params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db
+class TestTitlesFilter:
+
+    def test_genre(self, client, catalog):
+        assert names(client, genre='drama') == ['Драма', 'Драмеди']
+        assert names(client, genre='dram') == []
+        assert names(client, genre='drama,comedy') == [
+            'Драма', 'Драмеди', 'Комедия']
+        assert names(client, genre='drama,comedy', genre_mode='all') == [
+            'Драмеди']
+
+    def test_category(self, client, catalog):
+        assert names(client, category='book') == ['Комедия', 'Ужастик']
+        assert names(client, category='movie,book', genre='horror') == [
+            'Ужастик']
+
+    def test_year_range(self, client, catalog):
+        assert names(client, year_min=2000, year_max=2010) == [
+            'Драма', 'Комедия']
@@ -0,0 +1,62 @@
+import pytest
+from django.core.management import call_command
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleRating:
+
+    def test_rating_follows_review_changes(self, user_client, user, title,
+                                           authors):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Текст', 'score': 9})
+        assert response.status_code == 201
+        Review.objects.create(title=title, author=authors[0], text='Ок',
+                              score=4)
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (13, 2)
+        assert title.rating == 6.5
+
+        review_id = response.json()['id']
+        response = user_client.patch(f'{url}{review_id}/',
+                                     data={'score': 2})
+        assert response.status_code == 200
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (6, 2)
+
+        response = user_client.delete(f'{url}{review_id}/')
+        assert response.status_code == 204
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (4, 1)
+        assert title.rating == 4
+
+        Review.objects.filter(title=title).delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (0, 0)
+        assert title.rating is None
+
+    def test_rating_in_title_payload(self, client, title, authors):
+        for author, score in zip(authors, (10, 9, 9)):
+            Review.objects.create(title=title, author=author, text='Ок',
+                                  score=score)
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['rating'] == 9
+        assert 'score_sum' not in response.json()
+
+        response = client.get('/api/v1/titles/', {'rating_min': 9.5})
+        assert response.json()['count'] == 0
+        response = client.get('/api/v1/titles/', {'rating_min': 9})
+        assert response.json()['count'] == 1
+
+    def test_rebuild_counters(self, title, authors):
+        Review.objects.bulk_create([
+            Review(title=title, author=author, text='Ок', score=5)
+            for author in authors
+        ])
+        with pytest.raises(Exception):
+            call_command('rebuild_counters', check=True)
+        call_command('rebuild_counters')
+        call_command('rebuild_counters', check=True)
+        title = Title.objects.get(pk=title.pk)
+        assert (title.score_sum, title.reviews_count) == (50, 10)
+        assert title.rating == 5
@@ -0,0 +1,54 @@
+import pytest
+from django.core.management import call_command
+from reviews.counters import recount_titles
+from reviews.models import Review, ScoreHistogram, Title
+
+
+@pytest.mark.django_db
+class TestTitleRatings:
+
+    def test_histogram_follows_reviews(self, title, authors):
+        reviews = [
+            Review.objects.create(title=title, author=author, text='.',
+                                  score=score)
+            for author, score in zip(authors, (8, 8, 10, 3))
+        ]
+        reviews[0].score = 9
+        reviews[0].save()
+        reviews[3].delete()
+        other = Title.objects.create(name='Другое', year=2000)
+        moved = Review.objects.get(pk=reviews[1].pk)
+        moved.title = other
+        moved.save()
+
+        assert ScoreHistogram.objects.get(title=title).counts == [0] * 8 + [1, 1]
+        assert ScoreHistogram.objects.get(title=other).counts[7] == 1
+        assert recount_titles(check=True) == (2, 0)
+
+    def test_endpoint(self, client, title, authors,
+                      django_assert_num_queries):
+        for author, score in zip(authors, (7, 7, 10)):
+            Review.objects.create(title=title, author=author, text='.',
+                                  score=score)
+        with django_assert_num_queries(1):
+            response = client.get(f'/api/v1/titles/{title.id}/ratings/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 3
+        assert data['mean'] == 8
+        assert data['histogram']['7'] == 2
+        assert sorted(data['histogram'], key=int) == [
+            str(score) for score in range(1, 11)]
+
+        assert client.get('/api/v1/titles/999/ratings/').status_code == 404
+        assert client.get('/api/v1/titles/abc/ratings/').status_code == 404
+
+    def test_backfill(self, title, authors):
+        Review.objects.create(title=title, author=authors[0], text='.',
+                              score=5)
+        ScoreHistogram.objects.all().delete()
+        call_command('rebuild_counters')
+        assert ScoreHistogram.objects.get(title=title).counts[4] == 1
+        new_title = Title.objects.create(name='Без отзывов', year=2000)
+        assert ScoreHistogram.objects.get(title=new_title).counts == [
+            0] * 10
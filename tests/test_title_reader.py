@@ -0,0 +1,51 @@
+import json
+
+import pytest
+from api.readers import TitleReader
+from api.serializers import GetTitleSerializer
+from reviews.models import Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(category, genres, authors):
+    plain = Title.objects.create(name='Без категории', year=1990)
+    rated = Title.objects.create(name='С отзывами', year=2001,
+                                 category=category, description='Описание')
+    rated.genre.set(genres)
+    Genre.objects.create(name='Аниме', slug='anime').titles.add(rated)
+    for author, score in zip(authors, (7, 8)):
+        Review.objects.create(title=rated, author=author, text='.',
+                              score=score)
+    return [plain, rated]
+
+
+def serialized(queryset, names=None):
+    context = {'sparse_fields': names}
+    return json.loads(json.dumps(
+        GetTitleSerializer(queryset, many=True, context=context).data))
+
+
+@pytest.mark.django_db
+class TestTitleReader:
+
+    @pytest.mark.parametrize('names', (
+        None, ['id', 'name', 'rating'], ['genre'], ['category', 'year'],
+    ))
+    def test_parity(self, catalog, names):
+        queryset = Title.objects.select_related('category').prefetch_related(
+            'genre').order_by('name')
+        reader = TitleReader(names)
+        assert reader.to_representation(reader.prepare(queryset)) == (
+            serialized(queryset, names))
+
+    def test_api(self, client, catalog, django_assert_num_queries):
+        # COUNT, произведения с категориями, жанры страницы.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert response.json()['results'] == serialized(
+            Title.objects.order_by('name'))
+        rated = Title.objects.get(pk=catalog[1].pk)
+        response = client.get(f'/api/v1/titles/{rated.id}/')
+        assert response.json() == serialized([rated])[0]
+        assert response.json()['rating'] == 7
+        assert client.get('/api/v1/titles/999/').status_code == 404
@@ -0,0 +1,41 @@
+import pytest
+from api.search import InMemoryTitleSearch
+from reviews.models import Title
+
+
+@pytest.fixture
+def titles(category):
+    names = ('Война и мир', 'Мир Дикого Запада', 'Звёздные войны',
+             'Властелин колец')
+    return [Title.objects.create(name=name, year=2000, category=category)
+            for name in names]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_ranked_search(self, client, titles):
+        response = client.get('/api/v1/titles/', {'search': 'война мир'})
+        names = [title['name'] for title in response.json()['results']]
+        assert names[0] == 'Война и мир'
+        assert set(names) == {'Война и мир', 'Мир Дикого Запада'}
+
+        response = client.get('/api/v1/titles/', {'search': 'звезд'})
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Звёздные войны']
+
+    def test_index_follows_title_changes(self, titles):
+        search = InMemoryTitleSearch()
+        assert set(search.rank('властелин')) == {titles[3].pk}
+        titles[3].name = 'Хоббит'
+        search.update(titles[3])
+        assert not search.rank('властелин')
+        assert set(search.rank('хоббит')) == {titles[3].pk}
+        search.remove(titles[3].pk)
+        assert not search.rank('хоббит')
+
+    def test_search_respects_ordering(self, client, titles):
+        response = client.get('/api/v1/titles/',
+                              {'search': 'мир', 'ordering': '-name'})
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Мир Дикого Запада', 'Война и мир']
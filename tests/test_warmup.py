@@ -0,0 +1,38 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+
+from api.cache import get_stats
+from api.warmup import warm_up
+
+
+@pytest.mark.django_db
+def test_warm_up(client, category, genres):
+    report = warm_up()
+    assert {'cold_request', 'build_urls', 'build_serializers',
+            'build_filtersets', 'prime_caches',
+            'warm_request'} <= set(report)
+    # Соединение без CONN_MAX_AGE закроется в начале первого запроса.
+    assert 'connect_databases' not in report
+    # Прогрев не считается в статистике, но ответы уже в кеше.
+    assert get_stats() == {'hits': 0, 'misses': 0}
+    assert client.get('/api/v1/genres/')['X-Cache'] == 'HIT'
+
+
+@pytest.mark.django_db
+def test_warm_up_persistent_connections(monkeypatch):
+    monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', 60)
+    assert 'connect_databases' in warm_up()
+
+
+def test_warm_up_without_database():
+    report = warm_up(connect=False)
+    assert 'cold_request' not in report
+    assert cache.get('api:stats:misses') is None
+
+
+@pytest.mark.django_db
+def test_warmup_command(capsys):
+    call_command('warmup')
+    assert 'после прогрева' in capsys.readouterr().out